@@ -5,29 +5,73 @@ This module analyzes flaky tests using AI and generates insights and suggestions
 """
 
 import argparse
-import json
+import asyncio
+import hashlib
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Any, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
 
 from config import (
     OPENAI_API_KEY,
     OPENAI_MODEL,
     MOCK_AI_RESPONSES,
     AI_ENABLED,
+    PARALLEL_EXECUTIONS,
+    USE_BATCH_API,
+    BATCH_POLL_INTERVAL,
+    PREP_PROCESS_THRESHOLD,
+    TEMP_DIR,
+    SEMANTIC_CACHE_ENABLED,
+    PROMPT_CACHE_ENABLED,
+    CLUSTER_CACHE_ENABLED,
+    ensure_dirs,
 )
-from utils import get_logger
+from utils import dumps_json, get_logger, iter_jsonl, parse_json, read_json, resolve_log_refs, write_json
+
+if TYPE_CHECKING:
+    from utils.cache import ClusterInsightCache, SemanticInsightCache
 
 # Set up logger
 logger = get_logger(__name__)
 
-# Conditionally import OpenAI
+# Deterministic sampling keeps cached responses valid for identical prompts
+AI_TEMPERATURE = 0.0
+
+# Structured output schema, so each insight field comes back as its own string
+INSIGHT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "FlakyInsight",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "root_cause": {"type": "string"},
+                "recommendations": {"type": "string"},
+                "code_fix": {"type": "string"},
+            },
+            "required": ["root_cause", "recommendations", "code_fix"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Conditionally import ijson for streaming results parsing
 try:
-    import openai
-    OPENAI_AVAILABLE = True
+    import ijson
+    IJSON_AVAILABLE = True
 except ImportError:
-    logger.warning("OpenAI package not installed. Using mock responses.")
-    OPENAI_AVAILABLE = False
+    IJSON_AVAILABLE = False
+
+
+class PreparedTest(NamedTuple):
+    """Per-test values derived from the results before any AI request is made."""
+
+    prompt: str
+    sig: str
+    error_logs: str
 
 
 class AIInsightGenerator:
@@ -41,29 +85,110 @@ class AIInsightGenerator:
         openai_api_key: Optional[str] = OPENAI_API_KEY,
         openai_model: str = OPENAI_MODEL,
         mock_responses: bool = MOCK_AI_RESPONSES,
+        max_parallel: int = PARALLEL_EXECUTIONS,
+        use_batch_api: bool = USE_BATCH_API,
+        use_semantic_cache: bool = SEMANTIC_CACHE_ENABLED,
+        use_prompt_cache: bool = PROMPT_CACHE_ENABLED,
+        use_cluster_cache: bool = CLUSTER_CACHE_ENABLED,
+        on_partial_response: Optional[Callable[[str, str], None]] = None,
     ):
         self.results_file = Path(results_file)
+        self.output_file = self.results_file.with_name(f"{self.results_file.stem}_insights.json")
+        self.partial_file = self.output_file.with_suffix(".jsonl")
         self.openai_api_key = openai_api_key
         self.openai_model = openai_model
-        self.mock_responses = mock_responses or not OPENAI_AVAILABLE
+        self.mock_responses = mock_responses
+        self.max_parallel = max(1, max_parallel)
+        self.use_batch_api = use_batch_api
+        self.on_partial_response = on_partial_response
+        self._prepared: Dict[str, PreparedTest] = {}
+        self._partial_handle = None
         self.client = self._initialize_openai_client()
+        # Created per event loop in _generate_all_async, since its connection pool is bound to the loop
+        self.async_client = None
+        self.prompt_cache = self._initialize_prompt_cache(use_prompt_cache)
+        self.semantic_cache = self._initialize_semantic_cache(use_semantic_cache)
+        self.cluster_cache = self._initialize_cluster_cache(use_cluster_cache)
         self.results = self._load_results()
         self.insights = self._initialize_insights()
 
     def _initialize_openai_client(self):
         """Initialize the OpenAI client if available."""
-        if not self.mock_responses and self.openai_api_key:
+        # Mock runs never import openai, keeping startup fast
+        if self.mock_responses:
+            return None
+        try:
+            import openai
+        except ImportError:
+            logger.warning("OpenAI package not installed. Using mock responses.")
+            self.mock_responses = True
+            return None
+        if self.openai_api_key:
             try:
                 return openai.OpenAI(api_key=self.openai_api_key)
             except Exception as e:
                 logger.error(f"Failed to initialize OpenAI client: {e}")
         return None
 
+    def _initialize_async_openai_client(self):
+        """Initialize the async OpenAI client used for concurrent requests on the running event loop."""
+        if not self.mock_responses and self.openai_api_key:
+            import openai
+            try:
+                return openai.AsyncOpenAI(api_key=self.openai_api_key)
+            except Exception as e:
+                logger.error(f"Failed to initialize async OpenAI client: {e}")
+        return None
+
+    def _initialize_prompt_cache(self, enabled: bool):
+        """Initialize the exact-match prompt cache unless disabled or running on mock responses."""
+        if not enabled or self.mock_responses:
+            return None
+        from utils.cache import PromptDiskCache
+        return PromptDiskCache()
+
+    def _initialize_semantic_cache(self, enabled: bool) -> Optional["SemanticInsightCache"]:
+        """Initialize the semantic cache unless disabled or running on mock responses."""
+        if not enabled or self.mock_responses:
+            return None
+        from utils.cache import SemanticInsightCache
+        cache = SemanticInsightCache()
+        return cache if cache.available else None
+
+    def _initialize_cluster_cache(self, enabled: bool) -> Optional["ClusterInsightCache"]:
+        """Initialize the cluster cache unless disabled or running on mock responses."""
+        if not enabled or self.mock_responses:
+            return None
+        from utils.cache import ClusterInsightCache
+        cache = ClusterInsightCache()
+        return cache if cache.available else None
+
     def _load_results(self) -> Dict[str, Any]:
-        """Load flaky test results from a JSON file."""
+        """Load flaky test results from a JSON file, keeping only flaky tests."""
         try:
-            with open(self.results_file, "r") as f:
-                return json.load(f)
+            if IJSON_AVAILABLE:
+                # Stream the tests subtree so stable tests are never held in memory
+                with open(self.results_file, "rb") as f:
+                    tests = {
+                        test_id: data
+                        for test_id, data in ijson.kvitems(f, "tests", use_float=True)
+                        if data.get("flaky", False)
+                    }
+                # Only keep the shared log bodies the flaky tests point at
+                refs = {log["log_ref"] for data in tests.values() for log in data.get("logs", []) if "log_ref" in log}
+                log_bodies: Dict[int, str] = {}
+                if refs:
+                    with open(self.results_file, "rb") as f:
+                        for index, body in enumerate(ijson.items(f, "log_bodies.item")):
+                            if index in refs:
+                                log_bodies[index] = body
+                resolve_log_refs(tests, log_bodies)
+                return {"tests": tests}
+            results = read_json(self.results_file)
+            # Drop stable tests at ingest so they are not held for the whole run
+            results["tests"] = dict(self._iter_flaky(results.get("tests", {})))
+            resolve_log_refs(results["tests"], results.pop("log_bodies", []))
+            return results
         except Exception as e:
             logger.error(f"Error loading results from {self.results_file}: {e}")
             return {"tests": {}}
@@ -84,44 +209,428 @@ class AIInsightGenerator:
             logger.info("AI insights are disabled in the configuration.")
             return self.insights
 
-        flaky_tests = self._get_flaky_tests()
-        if not flaky_tests:
+        self._prepared = self._prepare_tests(self._get_flaky_tests())
+        if not self._prepared:
             logger.info("No flaky tests found in the results.")
             return self.insights
 
-        logger.info(f"Generating insights for {len(flaky_tests)} flaky tests.")
+        # Only flaky tests are kept when loading, so the results double as the flaky view
+        flaky_tests = self.results["tests"]
+        pending_tests = self._reuse_previous_insights(flaky_tests)
+        logger.info(f"Generating insights for {len(pending_tests)} of {len(flaky_tests)} flaky tests.")
+        use_batch = self.use_batch_api and not self.mock_responses and self.client is not None
+        if pending_tests:
+            # Completed insights are appended here so a crash keeps what was already generated;
+            # entries left by an earlier crash stay until the insights file is saved
+            self._partial_handle = open(self.partial_file, "ab")
+            try:
+                if use_batch:
+                    self._generate_all_batch(pending_tests)
+                else:
+                    asyncio.run(self._generate_all_async(pending_tests))
+            finally:
+                self._partial_handle.close()
+                self._partial_handle = None
+
+        if self.prompt_cache is not None:
+            self.prompt_cache.save()
+        if self.semantic_cache is not None:
+            self.semantic_cache.save()
+        if self.cluster_cache is not None:
+            self.cluster_cache.save()
+        self._save_insights()
+        return self.insights
+
+    def _reuse_previous_insights(self, flaky_tests: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy insights from a previous run for tests whose signature is unchanged.
+
+        Args:
+            flaky_tests: Flaky tests to generate insights for
+
+        Returns:
+            The flaky tests that still need a fresh insight
+        """
+        previous_insights = self._load_previous_insights()
+        if not previous_insights:
+            return flaky_tests
+
+        pending_tests = {}
         for test_id, test_data in flaky_tests.items():
+            prior = previous_insights.get(test_id)
+            if (
+                prior is not None
+                and not prior.get("fallback", False)
+                and prior.get("sig") == self._get_prepared(test_id, test_data).sig
+            ):
+                self.insights["insights"][test_id] = prior
+            else:
+                pending_tests[test_id] = test_data
+        reused = len(flaky_tests) - len(pending_tests)
+        if reused:
+            logger.info(f"Reusing {reused} insights with unchanged signatures from the previous run")
+        return pending_tests
+
+    def _load_previous_insights(self) -> Dict[str, Any]:
+        """
+        Collect insights from the last saved run and from the partial file of a run that did not finish.
+
+        Returns:
+            Mapping of test IDs to previous insights, with partial entries taking precedence
+        """
+        previous_insights: Dict[str, Any] = {}
+        if self.output_file.exists():
+            try:
+                previous = read_json(self.output_file)
+            except Exception as e:
+                logger.warning(f"Could not read previous insights from {self.output_file}: {e}")
+            else:
+                # Never let placeholder mock insights stand in for real ones
+                if not previous.get("metadata", {}).get("mock_responses") or self.mock_responses:
+                    previous_insights.update(previous.get("insights", {}))
+        if self.partial_file.exists():
             try:
-                insight = self._generate_test_insight(test_id, test_data)
-                self.insights["insights"][test_id] = insight
+                for record in iter_jsonl(self.partial_file):
+                    previous_insights.update(record)
             except Exception as e:
-                logger.error(f"Error generating insight for {test_id}: {e}")
+                logger.warning(f"Could not read partial insights from {self.partial_file}: {e}")
+        return previous_insights
+
+    def _prepare_tests(self, flaky_tests: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, PreparedTest]:
+        """
+        Build the prompt, signature and joined error logs of every flaky test.
+
+        Large suites spread this string work over a process pool so it does not
+        hold the GIL while the event loop is starting its requests.
+
+        Args:
+            flaky_tests: (test ID, test data) pairs of the flaky tests to prepare
+
+        Returns:
+            Mapping of test IDs to their prepared values
+        """
+        test_ids = []
+        test_data = []
+        for test_id, data in flaky_tests:
+            test_ids.append(test_id)
+            test_data.append(data)
+        workers = os.cpu_count() or 1
+        if workers == 1 or len(test_ids) < PREP_PROCESS_THRESHOLD:
+            return {test_id: _prepare_one(test_id, data) for test_id, data in zip(test_ids, test_data)}
+
+        chunksize = max(1, len(test_ids) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                prepared = executor.map(_prepare_one, test_ids, test_data, chunksize=chunksize)
+                return dict(zip(test_ids, prepared))
+        except Exception as e:
+            logger.warning(f"Parallel prompt preparation failed, preparing serially: {e}")
+            return {test_id: _prepare_one(test_id, data) for test_id, data in zip(test_ids, test_data)}
+
+    def _get_prepared(self, test_id: str, test_data: Dict[str, Any]) -> PreparedTest:
+        """Return the prepared values of a test, preparing it now if needed."""
+        prepared = self._prepared.get(test_id)
+        if prepared is None:
+            prepared = self._prepared[test_id] = _prepare_one(test_id, test_data)
+        return prepared
+
+    @staticmethod
+    def _get_signature(test_id: str, test_data: Dict[str, Any], error_logs: Optional[str] = None) -> str:
+        """Hash the parts of a test that determine its insight."""
+        if error_logs is None:
+            error_logs = AIInsightGenerator._get_error_logs(test_data)
+        module = test_data.get("module", test_id.split("::")[0])
+        content = module + AIInsightGenerator._get_test_name(test_id, test_data) + error_logs
+        return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    async def _generate_all_async(self, flaky_tests: Dict[str, Any]) -> None:
+        """Generate insights for all flaky tests concurrently."""
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        test_ids = list(flaky_tests)
+        embeddings = self._embed_flaky_tests(flaky_tests)
+        coros = [
+            self._record_when_done(
+                test_id,
+                self._generate_test_insight_async(test_id, flaky_tests[test_id], embeddings.get(test_id, {}), semaphore),
+            )
+            for test_id in test_ids
+        ]
+        self.async_client = self._initialize_async_openai_client()
+        try:
+            # return_exceptions keeps one failing test from cancelling the others
+            outcomes = await asyncio.gather(*coros, return_exceptions=True)
+        finally:
+            if self.async_client is not None:
+                await self.async_client.close()
+                self.async_client = None
+        for test_id, outcome in zip(test_ids, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error generating insight for {test_id}: {outcome}")
+
+    async def _record_when_done(self, test_id: str, insight_coro: Awaitable[Dict[str, Any]]) -> None:
+        """Await an insight and record it as soon as it completes."""
+        self._record_insight(test_id, await insight_coro)
+
+    def _record_insight(self, test_id: str, insight: Dict[str, Any]) -> None:
+        """
+        Store a freshly generated insight and append it to the partial insights file.
+
+        Args:
+            test_id: ID of the test
+            insight: Parsed insight for the test
+        """
+        self.insights["insights"][test_id] = insight
+        if self._partial_handle is None:
+            return
+        try:
+            self._partial_handle.write(dumps_json({test_id: insight}) + b"\n")
+            self._partial_handle.flush()
+        except Exception as e:
+            logger.error(f"Error appending insight for {test_id} to {self.partial_file}: {e}")
 
-        self._save_insights()
-        return self.insights
+    def _generate_all_batch(self, flaky_tests: Dict[str, Any]) -> None:
+        """Generate insights for all flaky tests through a single Batch API job."""
+        prompts = {}
+        embeddings = self._embed_flaky_tests(flaky_tests)
+        for test_id, test_data in flaky_tests.items():
+            prompt = self._get_prepared(test_id, test_data).prompt
+            cached_response = self._lookup_cached_response(prompt, test_id, test_data, embeddings.get(test_id, {}))
+            if cached_response is not None:
+                logger.info(f"Reusing cached insight for {test_id}")
+                self._record_insight(test_id, self._parse_ai_response(cached_response, test_id, test_data))
+            else:
+                prompts[test_id] = prompt
+        if not prompts:
+            return
 
-    def _get_flaky_tests(self) -> Dict[str, Any]:
-        """Extract flaky tests from the results."""
-        return {
-            test_id: data
-            for test_id, data in self.results.get("tests", {}).items()
-            if data.get("flaky", False)
-        }
+        try:
+            batch_id = self._submit_batch(prompts)
+            responses = self._poll_batch(batch_id)
+        except Exception as e:
+            logger.error(f"Batch API request failed, falling back to real-time calls: {e}")
+            asyncio.run(self._generate_all_async({test_id: flaky_tests[test_id] for test_id in prompts}))
+            return
+
+        for test_id in prompts:
+            test_data = flaky_tests[test_id]
+            response_text = responses.get(test_id)
+            if response_text is None:
+                logger.error(f"No batch response returned for {test_id}")
+                response_text = self._get_mock_response()
+            elif self._decode_response(response_text) is not None:
+                self._store_cached_response(prompts[test_id], embeddings.get(test_id, {}), response_text, test_id, test_data)
+            self._record_insight(test_id, self._parse_ai_response(response_text, test_id, test_data))
+
+    def _submit_batch(self, prompts: Dict[str, str]) -> str:
+        """
+        Upload prompts as a JSONL batch job.
+
+        Args:
+            prompts: Mapping of test IDs to prompts
+
+        Returns:
+            ID of the created batch
+        """
+        ensure_dirs()
+        batch_file = TEMP_DIR / f"{self.results_file.stem}_batch.jsonl"
+        with open(batch_file, "wb") as f:
+            for test_id, prompt in prompts.items():
+                request = {
+                    "custom_id": test_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.openai_model,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": 1500,
+                        "temperature": AI_TEMPERATURE,
+                        "response_format": INSIGHT_RESPONSE_FORMAT,
+                    },
+                }
+                f.write(dumps_json(request) + b"\n")
 
-    def _generate_test_insight(self, test_id: str, test_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate insight for a single flaky test."""
-        prompt = self._create_prompt(test_id, test_data)
-        response_text = self._get_ai_response(prompt)
+        try:
+            with open(batch_file, "rb") as f:
+                uploaded = self.client.files.create(file=f, purpose="batch")
+        finally:
+            batch_file.unlink()
+
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(prompts)} requests")
+        return batch.id
+
+    def _poll_batch(self, batch_id: str) -> Dict[str, str]:
+        """
+        Wait for a batch job to finish and collect its responses.
+
+        Args:
+            batch_id: ID of the batch to poll
+
+        Returns:
+            Mapping of test IDs to response text
+        """
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+            logger.info(f"Batch {batch_id} is {batch.status}, checking again in {BATCH_POLL_INTERVAL:.0f}s")
+            time.sleep(BATCH_POLL_INTERVAL)
+
+        responses = {}
+        if not batch.output_file_id:
+            return responses
+
+        content = self.client.files.content(batch.output_file_id)
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            entry = parse_json(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.error(f"Batch request for {entry.get('custom_id')} failed: {entry.get('error')}")
+                continue
+            responses[entry["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        return responses
+
+    def _get_flaky_tests(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Lazily yield (test ID, test data) pairs of the flaky tests in the results."""
+        return self._iter_flaky(self.results.get("tests", {}))
+
+    @staticmethod
+    def _iter_flaky(tests: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield the (test ID, test data) pairs of tests marked flaky."""
+        return ((test_id, data) for test_id, data in tests.items() if data.get("flaky", False))
+
+    async def _generate_test_insight_async(
+        self,
+        test_id: str,
+        test_data: Dict[str, Any],
+        embeddings: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        """Generate insight for a single flaky test, bounded by the semaphore."""
+        prompt = self._get_prepared(test_id, test_data).prompt
+        cached_response = self._lookup_cached_response(prompt, test_id, test_data, embeddings)
+        if cached_response is not None:
+            logger.info(f"Reusing cached insight for {test_id}")
+            return self._parse_ai_response(cached_response, test_id, test_data)
+
+        async with semaphore:
+            response_text = await self._get_ai_response_async(prompt, test_id)
+        if self._decode_response(response_text) is not None:
+            self._store_cached_response(prompt, embeddings, response_text, test_id, test_data)
         return self._parse_ai_response(response_text, test_id, test_data)
 
-    def _create_prompt(self, test_id: str, test_data: Dict[str, Any]) -> str:
+    def _prompt_cache_key(self, prompt: str) -> str:
+        """Build the exact-match cache key for a prompt."""
+        return self.prompt_cache.make_key(self.openai_model, prompt, AI_TEMPERATURE)
+
+    def _embed_flaky_tests(self, flaky_tests: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Embed the error logs of all flaky tests with one encoder call per cache.
+
+        Tests without logs all share the same placeholder text, so they are
+        left out and never match a cached entry.
+
+        Returns:
+            Mapping of test IDs to their "semantic" and "cluster" embeddings
+        """
+        test_ids = [test_id for test_id, test_data in flaky_tests.items() if test_data.get("logs")]
+        embeddings: Dict[str, Dict[str, Any]] = {test_id: {} for test_id in test_ids}
+        if not test_ids:
+            return embeddings
+
+        error_logs = [self._get_prepared(test_id, flaky_tests[test_id]).error_logs for test_id in test_ids]
+        if self.semantic_cache is not None:
+            for test_id, vector in zip(test_ids, self.semantic_cache.embed_many(error_logs)):
+                embeddings[test_id]["semantic"] = vector
+        if self.cluster_cache is not None:
+            texts = [
+                f"{flaky_tests[test_id].get('module', test_id.split('::')[0])}\n{logs}"
+                for test_id, logs in zip(test_ids, error_logs)
+            ]
+            for test_id, vector in zip(test_ids, self.cluster_cache.embed_many(texts)):
+                embeddings[test_id]["cluster"] = vector
+        return embeddings
+
+    def _lookup_cached_response(
+        self,
+        prompt: str,
+        test_id: str,
+        test_data: Dict[str, Any],
+        embeddings: Dict[str, Any],
+    ) -> Optional[str]:
+        """
+        Look up a cached response: exact prompt first, then similar logs, then similar clusters.
+
+        Cached responses that do not decode to a structured insight, such as
+        plain text from before structured outputs, count as misses.
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        if self.prompt_cache is not None:
+            cached_response = self.prompt_cache.get(self._prompt_cache_key(prompt))
+            if self._decode_response(cached_response) is not None:
+                return cached_response
+
+        if "semantic" in embeddings:
+            cached_response = self.semantic_cache.lookup(embeddings["semantic"], self._get_test_name(test_id, test_data))
+            if self._decode_response(cached_response) is not None:
+                return cached_response
+
+        if "cluster" in embeddings:
+            cached_response = self.cluster_cache.match(embeddings["cluster"], self._get_test_name(test_id, test_data))
+            if self._decode_response(cached_response) is not None:
+                return cached_response
+
+        return None
+
+    def _store_cached_response(
+        self,
+        prompt: str,
+        embeddings: Dict[str, Any],
+        response: str,
+        test_id: str,
+        test_data: Dict[str, Any],
+    ) -> None:
+        """Add a fresh AI response to the response caches."""
+        if self.prompt_cache is not None:
+            self.prompt_cache.put(self._prompt_cache_key(prompt), response)
+        if self.semantic_cache is not None and "semantic" in embeddings:
+            self.semantic_cache.add(
+                embeddings["semantic"],
+                {"test_id": test_id, "test_name": self._get_test_name(test_id, test_data), "response": response},
+            )
+        if self.cluster_cache is not None and "cluster" in embeddings:
+            self.cluster_cache.add(embeddings["cluster"], self._get_test_name(test_id, test_data), response)
+
+    @staticmethod
+    def _get_test_name(test_id: str, test_data: Dict[str, Any]) -> str:
+        """Get the display name of a test."""
+        return test_data.get("name", test_id.split("::")[-1])
+
+    @staticmethod
+    def _get_error_logs(test_data: Dict[str, Any]) -> str:
+        """Join the error logs recorded for a test."""
+        return "\n".join(log.get("log", "") for log in test_data.get("logs", [])) or "No error logs available."
+
+    @staticmethod
+    def _create_prompt(test_id: str, test_data: Dict[str, Any], error_logs: Optional[str] = None) -> str:
         """Create a prompt for the AI model."""
-        test_name = test_data.get("name", test_id.split("::")[-1])
+        test_name = AIInsightGenerator._get_test_name(test_id, test_data)
         module = test_data.get("module", test_id.split("::")[0])
         flaky_score = test_data.get("flaky_score", 0.0)
         passes = test_data.get("passes", 0)
         failures = test_data.get("failures", 0)
-        error_logs = "\n".join(log.get("log", "") for log in test_data.get("logs", [])) or "No error logs available."
+        if error_logs is None:
+            error_logs = AIInsightGenerator._get_error_logs(test_data)
 
         return f"""
 You are an expert in test automation. Analyze the following flaky test:
@@ -136,25 +645,40 @@ Failures: {failures}
 Error Logs:
 {error_logs}
 
-Provide:
-1. Root cause analysis
-2. Likely reason for flakiness
-3. Recommendations to fix the test
-4. Suggested code fix (if possible)
+Respond with a JSON object containing:
+- root_cause: Root cause analysis, including the likely reason for flakiness
+- recommendations: Recommendations to fix the test
+- code_fix: Suggested code fix as plain Python code without Markdown fences (empty if not possible)
 """
 
-    def _get_ai_response(self, prompt: str) -> str:
-        """Get a response from the AI model or mock response."""
-        if self.mock_responses:
+    async def _get_ai_response_async(self, prompt: str, test_id: str = "") -> str:
+        """
+        Stream a response from the AI model without blocking other requests.
+
+        Each new piece of text is passed to ``on_partial_response`` as it
+        arrives, so the buffer is joined only once at the end. The stream
+        always runs to the end, since a truncated JSON object cannot be parsed.
+        """
+        if self.mock_responses or self.async_client is None:
             return self._get_mock_response()
         try:
-            completion = self.client.chat.completions.create(
+            stream = await self.async_client.chat.completions.create(
                 model=self.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1500,
-                temperature=0.2,
+                temperature=AI_TEMPERATURE,
+                response_format=INSIGHT_RESPONSE_FORMAT,
+                stream=True,
             )
-            return completion.choices[0].message.content
+            chunks = []
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                chunks.append(delta)
+                if self.on_partial_response is not None:
+                    self.on_partial_response(test_id, delta)
+            return "".join(chunks)
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {e}")
             return self._get_mock_response()
@@ -163,26 +687,81 @@ Provide:
         """Return a mock response for testing."""
         return "Mock response: Unable to analyze the test due to insufficient data."
 
+    @staticmethod
+    def _decode_response(response: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Decode a structured insight response.
+
+        Returns:
+            The response fields, or None if the response is missing, empty or
+            not a JSON object (mock text, refusals, output cut off by max_tokens)
+        """
+        if not response:
+            return None
+        try:
+            fields = parse_json(response)
+        except ValueError:
+            return None
+        return fields if isinstance(fields, dict) else None
+
     def _parse_ai_response(self, response: str, test_id: str, test_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse the AI response into structured insights."""
-        return {
+        """
+        Parse the AI response into structured insights.
+
+        Responses that do not decode to a JSON object (the mock response that
+        stands in for failed API calls, empty or cut-off responses) are kept
+        whole as the root cause. Those insights are marked as fallbacks and get
+        no signature, so a later run asks again.
+        """
+        fields = self._decode_response(response)
+        fallback = fields is None
+        if fallback:
+            fields = {"root_cause": response}
+        insight = {
             "test_id": test_id,
             "test_name": test_data.get("name", test_id),
             "module": test_data.get("module", ""),
-            "root_cause": response,
-            "recommendations": response,
-            "code_fix": response,
+            "root_cause": fields.get("root_cause", ""),
+            "recommendations": fields.get("recommendations", ""),
+            "code_fix": fields.get("code_fix", ""),
         }
+        if fallback:
+            insight["fallback"] = True
+        else:
+            insight["sig"] = self._get_prepared(test_id, test_data).sig
+        return insight
 
     def _save_insights(self) -> None:
-        """Save insights to a JSON file."""
-        output_file = self.results_file.with_name(f"{self.results_file.stem}_insights.json")
+        """Save insights to a JSON file, replacing the partial insights file."""
         try:
-            with open(output_file, "w") as f:
-                json.dump(self.insights, f, indent=2)
-            logger.info(f"Insights saved to {output_file}")
+            write_json(self.insights, self.output_file)
+            logger.info(f"Insights saved to {self.output_file}")
         except Exception as e:
             logger.error(f"Error saving insights: {e}")
+            return
+        try:
+            self.partial_file.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not remove partial insights file {self.partial_file}: {e}")
+
+
+def _prepare_one(test_id: str, test_data: Dict[str, Any]) -> PreparedTest:
+    """
+    Prepare a single flaky test; module-level so process pool workers can run it.
+
+    Args:
+        test_id: ID of the test
+        test_data: Result data of the test
+
+    Returns:
+        The prompt, signature and joined error logs of the test
+    """
+    error_logs = AIInsightGenerator._get_error_logs(test_data)
+    return PreparedTest(
+        prompt=AIInsightGenerator._create_prompt(test_id, test_data, error_logs),
+        sig=AIInsightGenerator._get_signature(test_id, test_data, error_logs),
+        error_logs=error_logs,
+    )
 
 
 def main():
@@ -192,6 +771,18 @@ def main():
     parser.add_argument("--openai-api-key", help="OpenAI API key")
     parser.add_argument("--openai-model", default=OPENAI_MODEL, help="OpenAI model to use")
     parser.add_argument("--mock", action="store_true", help="Use mock responses instead of actual API calls")
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=PARALLEL_EXECUTIONS,
+        help=f"Maximum concurrent AI requests (default: {PARALLEL_EXECUTIONS})",
+    )
+    parser.add_argument(
+        "--batch",
+        action=argparse.BooleanOptionalAction,
+        default=USE_BATCH_API,
+        help="Submit all prompts as a single OpenAI Batch API job",
+    )
     args = parser.parse_args()
 
     generator = AIInsightGenerator(
@@ -199,6 +790,8 @@ def main():
         openai_api_key=args.openai_api_key,
         openai_model=args.openai_model,
         mock_responses=args.mock,
+        max_parallel=args.max_parallel,
+        use_batch_api=args.batch,
     )
     insights = generator.generate_insights()
 
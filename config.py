@@ -6,6 +6,7 @@ and provides default values when environment variables are not set.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -15,18 +16,35 @@ load_dotenv()
 # Base paths
 BASE_DIR = Path(__file__).resolve().parent
 RESULTS_DIR = BASE_DIR / "results"
-RESULTS_DIR.mkdir(exist_ok=True)
 
 # Test execution settings
 TEST_ITERATIONS = int(os.getenv("TEST_ITERATIONS", 5))
 PARALLEL_EXECUTIONS = int(os.getenv("PARALLEL_EXECUTIONS", 1))
 FLAKY_THRESHOLD = float(os.getenv("FLAKY_THRESHOLD", 0.2))  # 20% flakiness threshold
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "subprocess")  # "subprocess", "inprocess" or "pool"
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "false").lower() == "true"  # Skip unchanged stable tests
+ADAPTIVE_SAMPLING = os.getenv("ADAPTIVE_SAMPLING", "false").lower() == "true"  # Stop re-running converged tests
+ADAPTIVE_MIN_RUNS = int(os.getenv("ADAPTIVE_MIN_RUNS", 3))  # Unanimous runs before a test counts as converged
+INTER_ITERATION_SLEEP = float(os.getenv("INTER_ITERATION_SLEEP", 0))  # Seconds of backoff after resource errors, 0 to disable
+# Plugins to load in iteration runs, which otherwise skip plugin autoloading (comma-separated)
+PYTEST_PLUGINS = [p.strip() for p in os.getenv("PYTEST_PLUGINS", "").split(",") if p.strip()]
 
 # AI settings
 AI_ENABLED = os.getenv("AI_ENABLED", "true").lower() == "true"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 MOCK_AI_RESPONSES = os.getenv("MOCK_AI_RESPONSES", "false").lower() == "true" or not OPENAI_API_KEY
+USE_BATCH_API = os.getenv("USE_BATCH_API", "false").lower() == "true"
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", 30))  # Seconds between batch status checks
+PREP_PROCESS_THRESHOLD = int(os.getenv("PREP_PROCESS_THRESHOLD", 5000))  # Flaky tests before prompt prep uses processes
+
+# AI response caching settings
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.87))  # Minimum cosine similarity
+CLUSTER_CACHE_ENABLED = os.getenv("CLUSTER_CACHE_ENABLED", "false").lower() == "true"
+CLUSTER_CACHE_THRESHOLD = float(os.getenv("CLUSTER_CACHE_THRESHOLD", 0.9))  # Minimum similarity to a cluster
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 
 # Reporting settings
 GENERATE_HTML_REPORT = os.getenv("GENERATE_HTML_REPORT", "true").lower() == "true"
@@ -39,8 +57,18 @@ DASHBOARD_HOST = os.getenv("DASHBOARD_HOST", "localhost")
 # Logging settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = BASE_DIR / "logs" / "flakytestx.log"
-Path(LOG_FILE).parent.mkdir(exist_ok=True)
 
 # System settings
 TEMP_DIR = BASE_DIR / "temp"
-TEMP_DIR.mkdir(exist_ok=True)
\ No newline at end of file
+
+
+@lru_cache(maxsize=None)
+def ensure_dirs() -> None:
+    """
+    Create the results, logs and temp directories.
+
+    Called by code paths that write files rather than at import, so read-only
+    commands do not pay for the syscalls. Runs at most once per process.
+    """
+    for directory in (RESULTS_DIR, LOG_FILE.parent, TEMP_DIR):
+        directory.mkdir(exist_ok=True)
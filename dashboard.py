@@ -5,88 +5,209 @@ This module provides a Streamlit-based dashboard for visualizing
 flaky test results and insights.
 """
 
-import json
 import os
 import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union, Tuple
 
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
 from datetime import datetime
 
 # Import from our own modules
 from config import RESULTS_DIR
-from utils import get_logger
+from utils import get_logger, iter_jsonl, read_json, resolve_log_refs
 
 # Set up logger
 logger = get_logger(__name__)
 
+# Conditionally import ijson for streaming results parsing
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
-def load_results_file(file_path: Union[str, Path]) -> Dict[str, Any]:
+
+def get_mtime_ns(path: Union[str, Path]) -> int:
+    """
+    Get the modification time of a path, used to key cached loaders.
+    
+    Args:
+        path: File or directory path
+        
+    Returns:
+        Modification time in nanoseconds, or 0 if the path does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def get_insights_path(results_file: Union[str, Path]) -> Path:
+    """
+    Get the insights file path for a results file.
+    
+    Args:
+        results_file: Path to results file
+        
+    Returns:
+        Path to the matching insights file
+    """
+    results_path = Path(results_file)
+    return results_path.with_name(f"{results_path.stem}_insights.json")
+
+
+def get_partial_insights_path(results_file: Union[str, Path]) -> Path:
+    """
+    Get the partial insights file that is appended to while insights are generated.
+    
+    Args:
+        results_file: Path to results file
+        
+    Returns:
+        Path to the matching JSONL insights file
+    """
+    return get_insights_path(results_file).with_suffix(".jsonl")
+
+
+@st.cache_data(show_spinner=False)
+def load_results_file(file_path: Union[str, Path], file_mtime_ns: int) -> Dict[str, Any]:
     """
     Load test results from a JSON file.
     
     Args:
         file_path: Path to JSON results file
+        file_mtime_ns: Modification time of the file, so edits invalidate the cache
         
     Returns:
         Dictionary containing test results
     """
     try:
-        with open(file_path, "r") as f:
-            return json.load(f)
+        results = read_json(file_path)
+        resolve_log_refs(results.get("tests", {}), results.get("log_bodies", []))
+        return results
     except Exception as e:
         st.error(f"Error loading results file: {e}")
         return {}
 
 
-def load_insights_file(results_file: Union[str, Path]) -> Dict[str, Any]:
+@st.cache_data(show_spinner=False)
+def load_summary_only(file_path: Union[str, Path], file_mtime_ns: int) -> Dict[str, Any]:
+    """
+    Load only the metadata and summary sections of a results file.
+    
+    Used for files that are listed but not opened. The detector writes both
+    sections ahead of the tests, so streaming stops before the per-test data.
+    
+    Args:
+        file_path: Path to JSON results file
+        file_mtime_ns: Modification time of the file, so edits invalidate the cache
+        
+    Returns:
+        Dictionary containing the "metadata" and "summary" sections
+    """
+    if not IJSON_AVAILABLE:
+        results = load_results_file(file_path, file_mtime_ns)
+        return {"metadata": results.get("metadata", {}), "summary": results.get("summary", {})}
+    
+    try:
+        sections = {}
+        with open(file_path, "rb") as f:
+            for section in ("metadata", "summary"):
+                f.seek(0)
+                sections[section] = next(ijson.items(f, section, use_float=True), {})
+        return sections
+    except Exception as e:
+        logger.error(f"Error loading summary from {file_path}: {e}")
+        return {"metadata": {}, "summary": {}}
+
+
+@st.cache_data(show_spinner=False)
+def load_insights_file(
+    results_file: Union[str, Path],
+    insights_mtime_ns: int,
+    partial_mtime_ns: int = 0,
+) -> Dict[str, Any]:
     """
     Load AI insights for test results.
     
+    Insights from a generation run that is still in progress (or was
+    interrupted) are read from the partial JSONL file and take precedence.
+    
     Args:
         results_file: Path to results file (insights file name is derived from this)
+        insights_mtime_ns: Modification time of the insights file, so edits invalidate the cache
+        partial_mtime_ns: Modification time of the partial insights file
         
     Returns:
         Dictionary containing insights
     """
-    # Generate insights file path based on results file
-    results_path = Path(results_file)
-    insights_path = results_path.with_name(f"{results_path.stem}_insights.json")
+    insights_path = get_insights_path(results_file)
+    partial_path = get_partial_insights_path(results_file)
     
-    # Check if insights file exists
-    if not insights_path.exists():
+    # Check if any insights file exists
+    if not insights_path.exists() and not partial_path.exists():
         return {}
     
     # Load insights
+    insights: Dict[str, Any] = {}
     try:
-        with open(insights_path, "r") as f:
-            return json.load(f)
+        if insights_path.exists():
+            insights = read_json(insights_path)
+        if partial_path.exists():
+            test_insights = insights.setdefault("insights", {})
+            for record in iter_jsonl(partial_path):
+                test_insights.update(record)
+        return insights
     except Exception as e:
         st.error(f"Error loading insights file: {e}")
         return {}
 
 
-def get_results_files() -> List[Path]:
+@st.cache_data(ttl=5, show_spinner=False)
+def get_results_files(dir_mtime_ns: int) -> List[Tuple[Path, float]]:
     """
     Get list of available results files.
     
+    Args:
+        dir_mtime_ns: Modification time of the results directory, so new files invalidate the cache
+        
     Returns:
-        List of paths to results files
+        List of (path, modification time) tuples for results files
     """
-    results_dir = Path(RESULTS_DIR)
-    if not results_dir.exists():
+    try:
+        with os.scandir(RESULTS_DIR) as it:
+            # Find all JSON files that don't have "_insights" in the name
+            entries = [
+                e for e in it
+                if e.name.endswith(".json") and "_insights" not in e.name and e.is_file()
+            ]
+    except FileNotFoundError:
         return []
     
-    # Find all JSON files that don't have "_insights" in the name
-    return sorted(
-        [f for f in results_dir.glob("*.json") if "_insights" not in f.name],
-        key=lambda f: f.stat().st_mtime,
-        reverse=True,  # Most recent first
-    )
+    # DirEntry caches its stat result, so each file is stat'ed only once
+    files = [(Path(e.path), e.stat().st_mtime) for e in entries]
+    files.sort(key=lambda f: f[1], reverse=True)  # Most recent first
+    return files
+
+
+def format_results_option(option: Tuple[Path, float]) -> str:
+    """
+    Label a results file in the file selector.
+    
+    Args:
+        option: (path, modification time) tuple from get_results_files
+        
+    Returns:
+        File name, modification date and flaky test count
+    """
+    file_path, mtime = option
+    label = f"{file_path.stem} ({datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M')})"
+    summary = load_summary_only(file_path, get_mtime_ns(file_path)).get("summary", {})
+    if summary:
+        label += f" - {summary.get('flaky_tests', 0)} flaky of {summary.get('total_tests', 0)}"
+    return label
 
 
 def display_summary(results: Dict[str, Any]) -> None:
@@ -137,7 +258,10 @@ def display_summary(results: Dict[str, Any]) -> None:
     # Create and display stability pie chart
     st.subheader("Test Stability Overview")
     
-    fig, ax = plt.subplots(figsize=(8, 6))
+    # Charting libraries are imported on first render to keep cold start fast
+    import altair as alt
+    import pandas as pd
+    
     labels = ["Always Pass", "Always Fail", "Flaky Tests"]
     sizes = [
         summary.get("always_pass", 0),
@@ -148,10 +272,13 @@ def display_summary(results: Dict[str, Any]) -> None:
     
     # Only plot if there's data
     if sum(sizes) > 0:
-        ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', 
-                startangle=90, shadow=True)
-        ax.axis('equal')
-        st.pyplot(fig)
+        df = pd.DataFrame({"label": labels, "size": sizes})
+        chart = alt.Chart(df).mark_arc().encode(
+            theta=alt.Theta("size:Q"),
+            color=alt.Color("label:N", scale=alt.Scale(domain=labels, range=colors), title=None),
+            tooltip=["label", "size"],
+        )
+        st.altair_chart(chart, use_container_width=True)
     else:
         st.info("No data available for chart")
 
@@ -171,99 +298,132 @@ def display_flaky_tests(
         st.warning("No test information available")
         return
     
-    # Extract flaky tests
-    flaky_tests = {
-        test_id: data
-        for test_id, data in results["tests"].items()
+    import altair as alt
+    import pandas as pd
+    
+    # Build the flaky test frame straight from the results, without an intermediate dict
+    tests = results["tests"]
+    df = pd.DataFrame.from_records(
+        {**data, "test_id": test_id}
+        for test_id, data in tests.items()
         if data.get("flaky", False)
-    }
+    )
     
-    if not flaky_tests:
+    if df.empty:
         st.info("No flaky tests detected")
         return
     
     # Create and display flakiness score chart
     st.subheader("Flakiness Scores")
     
-    # Extract data for chart
-    test_names = [data.get("name", test_id.split("::")[-1]) 
-                 for test_id, data in flaky_tests.items()]
-    scores = [data.get("flaky_score", 0.0) for _, data in flaky_tests.items()]
-    
-    # Sort by score descending
-    sorted_indices = np.argsort(scores)[::-1]
-    test_names = [test_names[i] for i in sorted_indices]
-    scores = [scores[i] for i in sorted_indices]
+    # Build chart data once, sorted by score descending
+    df = df.set_index("test_id")
+    default_names = df.index.to_series().str.rsplit("::", n=1).str[-1]
+    df["display_name"] = df["name"].fillna(default_names) if "name" in df else default_names
+    df["flaky_score"] = df["flaky_score"].fillna(0.0) if "flaky_score" in df else 0.0
+    df = df.sort_values("flaky_score", ascending=False)
+    
+    # Create bar chart, rendered client-side from a small spec
+    chart_data = df[["display_name", "flaky_score"]]
+    bars = alt.Chart(chart_data).mark_bar(color="salmon").encode(
+        x=alt.X("display_name:N", sort=None, title="Test Name", axis=alt.Axis(labelAngle=-45)),
+        y=alt.Y("flaky_score:Q", title="Flakiness Score (0-1)", scale=alt.Scale(domain=[0, 1])),
+        tooltip=["display_name", alt.Tooltip("flaky_score:Q", format=".2f")],
+    )
+    labels = bars.mark_text(dy=-6).encode(text=alt.Text("flaky_score:Q", format=".2f"))
+    st.altair_chart((bars + labels).properties(title="Flakiness Score by Test"), use_container_width=True)
     
-    # Create bar chart
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.bar(test_names, scores, color='salmon')
+    # Precompute per-test display values in bulk rather than inside each expander
+    passes = df["passes"].fillna(0) if "passes" in df else pd.Series(0, index=df.index)
+    failures = df["failures"].fillna(0) if "failures" in df else pd.Series(0, index=df.index)
+    df["pass_rate"] = passes / (passes + failures).clip(lower=1) * 100
+    df["results_str"] = df["results"].map(format_results) if "results" in df else ""
     
-    # Add labels and formatting
-    ax.set_xlabel('Test Name')
-    ax.set_ylabel('Flakiness Score (0-1)')
-    ax.set_title('Flakiness Score by Test')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    # Display detailed information for each flaky test
+    st.subheader("Flaky Test Details")
     
-    # Add values above bars
-    for bar, score in zip(bars, scores):
-        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.01,
-                f'{score:.2f}', ha='center', va='bottom')
+    test_insights = insights.get("insights", {}) if insights else {}
+    for test_id, row in zip(df.index, df.itertuples(index=False)):
+        display_test_details(
+            test_id,
+            tests[test_id],
+            test_insights.get(test_id),
+            row.pass_rate,
+            row.results_str,
+        )
+
+
+def format_results(results: Any) -> str:
+    """
+    Format a sequence of pass/fail results as rows of ✅/❌ marks.
     
-    st.pyplot(fig)
+    Args:
+        results: List of booleans, one per iteration
+        
+    Returns:
+        Marks string with a line break every 10 results
+    """
+    if not isinstance(results, list):
+        return ""
+    marks = ["✅ " if result else "❌ " for result in results]
+    return "\n".join("".join(marks[i:i + 10]) for i in range(0, len(marks), 10))
+
+
+@st.fragment
+def display_test_details(
+    test_id: str,
+    data: Dict[str, Any],
+    test_insight: Optional[Dict[str, Any]],
+    pass_rate: float,
+    results_str: str,
+) -> None:
+    """
+    Display the expander for a single flaky test.
     
-    # Display detailed information for each flaky test
-    st.subheader("Flaky Test Details")
+    Rendered as a fragment so interacting with one test only reruns its own expander.
     
-    for test_id, data in flaky_tests.items():
-        with st.expander(f"{data.get('name', test_id)} - Flakiness: {data.get('flaky_score', 0.0):.2f}"):
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Passes", data.get("passes", 0))
-            with col2:
-                st.metric("Failures", data.get("failures", 0))
-            with col3:
-                pass_rate = data.get("passes", 0) / (data.get("passes", 0) + data.get("failures", 0)) * 100 if data.get("passes", 0) + data.get("failures", 0) > 0 else 0
-                st.metric("Pass Rate", f"{pass_rate:.1f}%")
+    Args:
+        test_id: Test identifier
+        data: Test result data
+        test_insight: AI insight for the test, if any
+        pass_rate: Precomputed pass rate percentage
+        results_str: Precomputed pass/fail marks
+    """
+    with st.expander(f"{data.get('name', test_id)} - Flakiness: {data.get('flaky_score', 0.0):.2f}"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Passes", data.get("passes", 0))
+        with col2:
+            st.metric("Failures", data.get("failures", 0))
+        with col3:
+            st.metric("Pass Rate", f"{pass_rate:.1f}%")
+        
+        # Display test results as a sequence of pass/fail
+        st.markdown("**Test Run Results:**")
+        st.text(results_str)
+        
+        # Display AI insights if available
+        if test_insight:
+            st.markdown("### 🤖 AI Analysis")
             
-            # Display test results as a sequence of pass/fail
-            st.markdown("**Test Run Results:**")
-            results_str = ""
-            for i, result in enumerate(data.get("results", [])):
-                if result:
-                    results_str += "✅ "
-                else:
-                    results_str += "❌ "
-                # Add line break every 10 results
-                if (i + 1) % 10 == 0:
-                    results_str += "\n"
-            st.text(results_str)
+            if test_insight.get("root_cause"):
+                st.markdown("**Root Cause:**")
+                st.markdown(test_insight["root_cause"])
             
-            # Display AI insights if available
-            if insights and "insights" in insights and test_id in insights["insights"]:
-                test_insight = insights["insights"][test_id]
-                
-                st.markdown("### 🤖 AI Analysis")
-                
-                if test_insight.get("root_cause"):
-                    st.markdown("**Root Cause:**")
-                    st.markdown(test_insight["root_cause"])
-                
-                if test_insight.get("recommendations"):
-                    st.markdown("**Recommendations:**")
-                    st.markdown(test_insight["recommendations"])
-                
-                if test_insight.get("code_fix"):
-                    st.markdown("**Suggested Code Fix:**")
-                    st.code(test_insight["code_fix"], language="python")
+            if test_insight.get("recommendations"):
+                st.markdown("**Recommendations:**")
+                st.markdown(test_insight["recommendations"])
             
-            # Display error logs
-            if data.get("logs"):
-                st.markdown("### ⚠️ Error Logs")
-                for log_entry in data.get("logs", []):
-                    st.markdown(f"**Iteration {log_entry.get('iteration', '?')}:**")
-                    st.text(log_entry.get("log", "No log available"))
+            if test_insight.get("code_fix"):
+                st.markdown("**Suggested Code Fix:**")
+                st.code(test_insight["code_fix"], language="python")
+        
+        # Display error logs
+        if data.get("logs"):
+            st.markdown("### ⚠️ Error Logs")
+            for log_entry in data.get("logs", []):
+                st.markdown(f"**Iteration {log_entry.get('iteration', '?')}:**")
+                st.text(log_entry.get("log", "No log available"))
 
 
 def main():
@@ -280,25 +440,31 @@ def main():
     st.markdown("### AI-Powered Flaky Test Detection and Analysis")
     
     # Get available results files
-    results_files = get_results_files()
+    results_files = get_results_files(get_mtime_ns(RESULTS_DIR))
     
     if not results_files:
         st.warning("No test results found. Run the flaky test detector first.")
         return
     
     # Create file selector
-    selected_file = st.sidebar.selectbox(
+    selected = st.sidebar.selectbox(
         "Select Results File",
         options=results_files,
-        format_func=lambda x: f"{x.stem} ({datetime.fromtimestamp(x.stat().st_mtime).strftime('%Y-%m-%d %H:%M')})",
+        format_func=format_results_option,
     )
     
-    if selected_file:
+    if selected:
+        selected_file = selected[0]
+        
         # Load selected results file
-        results = load_results_file(selected_file)
+        results = load_results_file(selected_file, get_mtime_ns(selected_file))
         
         # Load insights if available
-        insights = load_insights_file(selected_file)
+        insights = load_insights_file(
+            selected_file,
+            get_mtime_ns(get_insights_path(selected_file)),
+            get_mtime_ns(get_partial_insights_path(selected_file)),
+        )
         
         if not results:
             st.error("Failed to load results file")
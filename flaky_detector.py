@@ -6,33 +6,238 @@ collecting test results, and identifying flaky tests.
 """
 
 import argparse
-import json
+import hashlib
+import importlib.util
+import inspect
+import multiprocessing
 import os
 import subprocess
+import shutil
 import sys
+import tempfile
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from html import escape
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple, Union, Any
 
 import pytest
 from tqdm import tqdm
-import matplotlib.pyplot as plt
 import numpy as np
 
 # Import from our own modules
 from config import (
     TEST_ITERATIONS,
     RESULTS_DIR,
+    TEMP_DIR,
     FLAKY_THRESHOLD,
     PARALLEL_EXECUTIONS,
     GENERATE_HTML_REPORT,
+    PYTEST_PLUGINS,
+    EXECUTION_MODE,
+    RESULT_CACHE_ENABLED,
+    ADAPTIVE_SAMPLING,
+    ADAPTIVE_MIN_RUNS,
+    INTER_ITERATION_SLEEP,
+    ensure_dirs,
 )
-from utils import get_logger
+from utils import get_logger, parse_json, read_json, write_json
+
+# Conditionally import msgspec for typed decoding of pytest JSON reports
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
 
 # Set up logger
 logger = get_logger(__name__)
 
+# Ways of running a single test iteration
+EXECUTION_MODES = ("subprocess", "inprocess", "pool")
+
+# Output of a pytest run that points at resource exhaustion rather than a test bug
+RESOURCE_ERROR_MARKERS = ("OSError", "ResourceWarning")
+MAX_INTER_ITERATION_SLEEP = 10.0
+
+# The detector parallelizes iterations itself, so a project's xdist -n is overridden
+# with no workers while the rest of its addopts still apply
+XDIST_AVAILABLE = importlib.util.find_spec("xdist") is not None
+PYTEST_OVERRIDES = ["-n", "0"] if XDIST_AVAILABLE else []
+# Subprocess iterations disable plugin autoload, so they load xdist explicitly for the override
+SUBPROCESS_PYTEST_OVERRIDES = ["-p", "xdist.plugin", *PYTEST_OVERRIDES] if XDIST_AVAILABLE else []
+
+# Where /dev/fd exists, pytest writes its JSON report straight into an inherited anonymous file
+REPORT_VIA_FD = os.path.isdir("/dev/fd")
+
+# One test outcome: (nodeid, outcome, failure log text)
+TestRecord = Tuple[str, str, str]
+
+
+class ResultCollector:
+    """
+    pytest plugin that records test outcomes in memory during an in-process run.
+    """
+
+    def __init__(self):
+        self.records: List[TestRecord] = []
+
+    def pytest_runtest_logreport(self, report) -> None:
+        """Record the call phase of each test, or its setup phase if setup did not pass."""
+        if report.when == "call" or (report.when == "setup" and not report.passed):
+            log_text = str(report.longrepr) if report.failed and report.longrepr else ""
+            self.records.append((report.nodeid, report.outcome, log_text))
+
+
+class CollectionRecorder:
+    """
+    pytest plugin that records the collected tests and optionally hashes their source.
+    """
+
+    def __init__(self, hash_sources: bool = False):
+        self.hash_sources = hash_sources
+        self.node_args: Dict[str, str] = {}
+        self.hashes: Dict[str, str] = {}
+
+    def pytest_collection_modifyitems(self, items) -> None:
+        """Record each item's node ID and the absolute-path argument that selects it."""
+        for item in items:
+            # Absolute paths keep the selection valid regardless of the rootdir
+            _, sep, rest = item.nodeid.partition("::")
+            self.node_args[item.nodeid] = f"{item.path}{sep}{rest}"
+            if not self.hash_sources:
+                continue
+            try:
+                source = inspect.getsource(item.obj)
+            except (AttributeError, OSError, TypeError):
+                continue
+            self.hashes[item.nodeid] = hashlib.sha256(source.encode()).hexdigest()
+
+
+if MSGSPEC_AVAILABLE:
+    class _ReportPhase(msgspec.Struct):
+        """A test phase in a pytest-json-report file."""
+        longrepr: Optional[str] = None
+
+    class _ReportTest(msgspec.Struct):
+        """A test entry in a pytest-json-report file."""
+        nodeid: str = ""
+        outcome: str = ""
+        call: Optional[_ReportPhase] = None
+
+    class _Report(msgspec.Struct):
+        """The parts of a pytest-json-report file the detector reads."""
+        tests: List[_ReportTest] = []
+
+
+def _parse_report_records(data: bytes) -> List[TestRecord]:
+    """
+    Parse the test records out of a pytest-json-report document.
+
+    With msgspec installed the report is decoded straight into typed structs,
+    skipping every field the detector does not use.
+
+    Args:
+        data: Contents of the JSON report
+
+    Returns:
+        (nodeid, outcome, failure log) tuples for each test in the report
+    """
+    if MSGSPEC_AVAILABLE:
+        report = msgspec.json.decode(data, type=_Report)
+        return [
+            (test.nodeid, test.outcome, (test.call.longrepr or "") if test.call else "")
+            for test in report.tests
+        ]
+    report = parse_json(data)
+    records = []
+    append = records.append
+    for test_data in report["tests"] if "tests" in report else ():
+        call = test_data["call"] if "call" in test_data else None
+        append((
+            test_data["nodeid"] if "nodeid" in test_data else "",
+            test_data["outcome"] if "outcome" in test_data else "",
+            (call["longrepr"] or "") if call and "longrepr" in call else "",
+        ))
+    return records
+
+
+@lru_cache(maxsize=None)
+def _parse_nodeid(nodeid: str) -> Tuple[str, str]:
+    """
+    Split a pytest node ID into its module path and test name.
+
+    Args:
+        nodeid: Test node ID, e.g. "tests/test_x.py::TestX::test_y[1]"
+
+    Returns:
+        (module, name) tuple; the name is the whole node ID if it has no "::"
+    """
+    module, sep, rest = nodeid.partition("::")
+    return module, rest.rpartition("::")[2] if sep else nodeid
+
+
+def _unload_test_modules(test_root: Path, modules_before: Set[str]) -> None:
+    """
+    Remove modules imported from the test path since modules_before was taken.
+
+    Args:
+        test_root: Directory holding the test modules
+        modules_before: Names in sys.modules before the test run
+    """
+    for name in set(sys.modules) - modules_before:
+        module_file = getattr(sys.modules[name], "__file__", None)
+        if module_file and test_root in Path(module_file).resolve().parents:
+            del sys.modules[name]
+
+
+def _init_pool_worker(collect_args: List[str], test_root: Path) -> None:
+    """
+    Warm up a pool worker that was not forked by collecting the suite once.
+
+    Collection imports pytest and everything the test modules import. The test
+    modules themselves are dropped again, so each iteration still starts from
+    freshly imported test state while their dependencies stay loaded.
+
+    Args:
+        collect_args: pytest arguments selecting the tests
+        test_root: Directory holding the test modules
+    """
+    modules_before = set(sys.modules)
+    try:
+        pytest.main(["--collect-only", *PYTEST_OVERRIDES, "-p", "no:cacheprovider", "-p", "no:terminal", *collect_args])
+    except Exception as e:
+        logger.error(f"Error warming up pool worker: {e}")
+    finally:
+        _unload_test_modules(test_root, modules_before)
+
+
+def _run_pool_iteration(iteration: int, pytest_args: List[str], test_root: Path) -> Optional[List[TestRecord]]:
+    """
+    Run the test suite once inside a pool worker with pytest.main().
+
+    Args:
+        iteration: Zero-based iteration number
+        pytest_args: Arguments for pytest.main()
+        test_root: Directory holding the test modules
+
+    Returns:
+        Test records captured by the collector, or None if the iteration failed
+    """
+    logger.info(f"Starting iteration {iteration + 1} in worker {os.getpid()}")
+    collector = ResultCollector()
+    modules_before = set(sys.modules)
+    try:
+        pytest.main(pytest_args, plugins=[collector])
+        return collector.records
+    except Exception as e:
+        logger.error(f"Error running tests in iteration {iteration + 1}: {e}")
+        return None
+    finally:
+        _unload_test_modules(test_root, modules_before)
+
 
 class FlakyDetector:
     """
@@ -44,6 +249,11 @@ class FlakyDetector:
         test_path: Union[str, Path],
         iterations: int = TEST_ITERATIONS,
         output_file: Optional[Union[str, Path]] = None,
+        max_parallel: int = PARALLEL_EXECUTIONS,
+        execution_mode: str = EXECUTION_MODE,
+        use_cache: bool = RESULT_CACHE_ENABLED,
+        adaptive: bool = ADAPTIVE_SAMPLING,
+        inter_iteration_sleep: float = INTER_ITERATION_SLEEP,
     ):
         """
         Initialize the flaky test detector.
@@ -52,9 +262,37 @@ class FlakyDetector:
             test_path: Path to test directory or file
             iterations: Number of times to run each test
             output_file: Path to save results
+            max_parallel: Maximum number of test iterations to run concurrently
+            execution_mode: "subprocess" to run each iteration in its own pytest
+                process, "inprocess" to run them through pytest.main(), or "pool"
+                to run them through pytest.main() in long-lived worker processes
+            use_cache: Whether to skip tests whose source is unchanged since they
+                were last seen always passing or always failing
+            adaptive: Whether to stop re-running tests once they have passed or
+                failed unanimously for ADAPTIVE_MIN_RUNS iterations
+            inter_iteration_sleep: Initial pause before the next subprocess iteration
+                after a run reported resource errors, doubled while they persist;
+                0 never pauses
         """
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution_mode}")
         self.test_path = Path(test_path)
         self.iterations = iterations
+        self.max_parallel = max(1, max_parallel)
+        self.execution_mode = execution_mode
+        self.use_cache = use_cache
+        self.adaptive = adaptive
+        self.inter_iteration_sleep = max(0.0, inter_iteration_sleep)
+        self._backoff = 0.0
+        self._converged: Set[str] = set()
+        # Kept under cache/ with the insight caches, out of the dashboard's results listing
+        self._cache_file = RESULTS_DIR / "cache" / "flaky_cache.json"
+        self._source_hashes: Dict[str, str] = {}
+        self._cached_tests: Dict[str, Dict[str, Any]] = {}
+        
+        # Tests collected once up front and passed explicitly to every iteration
+        self._collected: Optional[Dict[str, str]] = None
+        self._selection: Optional[List[str]] = None
         
         # Generate default output file name if not provided
         if output_file is None:
@@ -65,6 +303,7 @@ class FlakyDetector:
         
         # Create output directory if it doesn't exist
         self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._selection_file = TEMP_DIR / f"{self.output_file.stem}_nodeids.txt"
         
         # Initialize results data structure
         self.results = {
@@ -74,7 +313,7 @@ class FlakyDetector:
                 "test_path": str(self.test_path),
                 "output_file": str(self.output_file),
             },
-            "tests": {},
+            # Written ahead of the tests so streaming readers reach it without parsing them
             "summary": {
                 "total_tests": 0,
                 "flaky_tests": 0,
@@ -83,7 +322,20 @@ class FlakyDetector:
                 "always_fail": 0,
                 "suite_stability_percentage": 0,
             },
+            "tests": {},
+            "log_bodies": [],
         }
+        
+        # Columnar per-test state, one row per test; records are only built for the output
+        self._test_index: Dict[str, int] = {}
+        self._passed = np.zeros((0, iterations), dtype=np.uint8)
+        self._seen = np.zeros((0, iterations), dtype=np.uint8)
+        # Running per-test totals, updated as each iteration is processed
+        self._pass_count = np.zeros(0, dtype=np.int32)
+        self._runs = np.zeros(0, dtype=np.int32)
+        self._logs: List[List[Dict[str, Any]]] = []
+        # Identical failure logs are stored once and referenced by index
+        self._log_pool: Dict[str, int] = {}
 
     def run_tests(self) -> Dict[str, Any]:
         """
@@ -94,63 +346,30 @@ class FlakyDetector:
         """
         logger.info(f"Starting test detection with {self.iterations} iterations")
         logger.info(f"Testing path: {self.test_path}")
+        ensure_dirs()
         
-        # Build test run command
-        test_path_str = str(self.test_path)
-        
-        # Track all discovered tests
-        all_tests: Set[str] = set()
-        
-        # Track pass/fail for each test across iterations
-        test_results: Dict[str, List[bool]] = {}
+        # Collect once; iterations then run the fixed list of node IDs
+        self._collect_tests()
+        if self.use_cache:
+            self._load_cached_tests()
+        self._update_selection()
         
-        # Run tests multiple times and collect results
-        for iteration in tqdm(range(self.iterations), desc="Running test iterations"):
-            logger.info(f"Starting iteration {iteration + 1}/{self.iterations}")
-            
-            # Create a temporary results file for this iteration
-            temp_results_file = RESULTS_DIR / f"temp_results_{iteration}.json"
-            
-            # Run pytest with JSON output
-            pytest_args = [
-                "-v",
-                f"--json-report",
-                f"--json-report-file={temp_results_file}",
-                "--no-header",
-                test_path_str,
-            ]
-            
+        if self._selection is not None and not self._selection:
+            logger.info("No tests left to run")
+        else:
             try:
-                # Run pytest as a subprocess to isolate test runs
-                result = subprocess.run(
-                    [sys.executable, "-m", "pytest"] + pytest_args,
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                )
-                
-                # Parse test results from the JSON file
-                if temp_results_file.exists():
-                    with open(temp_results_file, "r") as f:
-                        iteration_results = json.load(f)
-                    
-                    # Process test results
-                    self._process_iteration_results(iteration_results, all_tests, test_results)
-                    
-                    # Clean up temporary file
-                    temp_results_file.unlink()
-                else:
-                    logger.error(f"Results file not found for iteration {iteration + 1}")
-                
-            except Exception as e:
-                logger.error(f"Error running tests in iteration {iteration + 1}: {e}")
-                continue
-            
-            # Short pause between iterations to avoid resource conflicts
-            time.sleep(0.5)
+                self._run_iterations()
+            finally:
+                self._selection_file.unlink(missing_ok=True)
+        
+        # Cached stable tests count as having run with their known outcome
+        self._merge_cached_tests()
         
         # Calculate flakiness metrics
-        self._calculate_flakiness_metrics(all_tests, test_results)
+        self._calculate_flakiness_metrics()
+        
+        if self.use_cache:
+            self._save_cache()
         
         # Save the results
         self._save_results()
@@ -161,134 +380,565 @@ class FlakyDetector:
         
         return self.results
 
-    def _process_iteration_results(
-        self,
-        iteration_results: Dict,
-        all_tests: Set[str],
-        test_results: Dict[str, List[bool]],
-    ) -> None:
+    def _collect_tests(self) -> None:
         """
-        Process results from a single test iteration.
+        Collect the test suite once, in-process, and record its node IDs.
+
+        If collection does not finish cleanly, iterations fall back to running
+        the test path so pytest reports the collection errors itself.
+        """
+        recorder = CollectionRecorder(hash_sources=self.use_cache)
+        modules_before = set(sys.modules)
+        try:
+            exit_code = pytest.main(
+                ["--collect-only", *PYTEST_OVERRIDES, "-p", "no:cacheprovider", "-p", "no:terminal", str(self.test_path)],
+                plugins=[recorder],
+            )
+        except Exception as e:
+            logger.error(f"Error collecting tests: {e}")
+            return
+        finally:
+            _unload_test_modules(self._test_root(), modules_before)
+        
+        if exit_code not in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED):
+            logger.warning(f"Test collection exited with {exit_code!r}, running the test path instead")
+            return
+        self._collected = recorder.node_args
+        self._source_hashes = recorder.hashes
+        logger.info(f"Collected {len(self._collected)} tests")
+
+    def _load_cached_tests(self) -> None:
+        """
+        Find tests that can be skipped because their source is unchanged and they were stable.
+
+        Cache entries whose source hash no longer matches are ignored and
+        replaced after this run.
+        """
+        if not self._cache_file.exists():
+            return
+        try:
+            cache = read_json(self._cache_file)
+        except Exception as e:
+            logger.warning(f"Could not read result cache {self._cache_file}: {e}")
+            return
+        
+        self._cached_tests = {
+            test_id: entry
+            for test_id, entry in cache.items()
+            if entry.get("hash") == self._source_hashes.get(test_id)
+            and (entry.get("passes") == 0 or entry.get("failures") == 0)
+            # A verdict from fewer runs than this one asks for is not trusted
+            and entry.get("passes", 0) + entry.get("failures", 0) >= self.iterations
+        }
+        if self._cached_tests:
+            logger.info(f"Skipping {len(self._cached_tests)} unchanged stable tests from the result cache")
+
+    def _selection_args(self, use_file: bool) -> List[str]:
+        """
+        Build the pytest arguments that select the tests to run.
+
+        Args:
+            use_file: Pass the collected node IDs through an @file argument
+                instead of listing them on the command line
+
+        Returns:
+            pytest arguments selecting the tests
+        """
+        if self._selection is None:
+            args: List[str] = []
+            for test_id in self._converged.union(self._cached_tests):
+                args += ["--deselect", test_id]
+            return args + [str(self.test_path)]
+        if use_file:
+            return [f"@{self._selection_file}"]
+        return list(self._selection)
+
+    def _merge_cached_tests(self) -> None:
+        """Fill the outcome matrices of skipped tests from their cached verdict."""
+        for test_id, entry in self._cached_tests.items():
+            row = self._get_test_row(test_id)
+            always_passed = entry["failures"] == 0
+            self._passed[row] = always_passed
+            self._seen[row] = 1
+            self._pass_count[row] = self.iterations if always_passed else 0
+            self._runs[row] = self.iterations
+
+    def _save_cache(self) -> None:
+        """
+        Record the verdicts of this run, keyed by test ID with the source hash they belong to.
+
+        Tests that converged early are left out, since their verdict rests on
+        fewer runs than requested.
+        """
+        cache = {}
+        for test_id, source_hash in self._source_hashes.items():
+            if test_id in self._cached_tests:
+                cache[test_id] = self._cached_tests[test_id]
+                continue
+            test_data = self.results["tests"].get(test_id)
+            if test_data is None or test_data["passes"] + test_data["failures"] == 0:
+                # Not run, or skipped by the metrics for missing iterations
+                continue
+            if test_id in self._converged:
+                # Stopped early by adaptive sampling, so a few lucky runs must not hide a flaky test
+                continue
+            cache[test_id] = {
+                "hash": source_hash,
+                "passes": test_data["passes"],
+                "failures": test_data["failures"],
+                "iterations": self.iterations,
+            }
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            write_json(cache, self._cache_file, indent=False)
+        except Exception as e:
+            logger.error(f"Error saving result cache: {e}")
+
+    def _update_selection(self) -> None:
+        """Select the collected tests that are neither cached nor converged."""
+        if self._collected is None:
+            return
+        skipped = self._converged.union(self._cached_tests)
+        self._selection = [arg for test_id, arg in self._collected.items() if test_id not in skipped]
+
+    def _run_iterations(self) -> None:
+        """
+        Run all iterations and process the records of each as it finishes.
+
+        Iterations run in waves of concurrent runs. With adaptive sampling the
+        selection is narrowed after every wave to drop converged tests.
+        """
+        inprocess = self.execution_mode == "inprocess"
+        # pytest.main() is not thread-safe, so in-process iterations run one at a time
+        workers = 1 if inprocess else (min(self.max_parallel, self.iterations) or 1)
+        wave_size = workers if self.adaptive else max(1, self.iterations)
+        
+        # disable=None hides the progress bar when not attached to a TTY
+        progress = tqdm(total=self.iterations, desc="Running test iterations", disable=None)
+        with self._create_executor(workers) as executor:
+            for start in range(0, self.iterations, wave_size):
+                wave = range(start, min(start + wave_size, self.iterations))
+                if inprocess:
+                    iteration_outputs = map(self._run_iteration_inprocess, wave)
+                elif self.execution_mode == "pool":
+                    test_root = self._test_root()
+                    iteration_outputs = executor.map(
+                        _run_pool_iteration,
+                        wave,
+                        [self._inprocess_args(iteration) for iteration in wave],
+                        [test_root] * len(wave),
+                    )
+                else:
+                    if self._selection is not None:
+                        self._selection_file.write_text("\n".join(self._selection) + "\n")
+                    # map yields results in iteration order
+                    iteration_outputs = executor.map(self._run_iteration, wave)
+                for iteration, records in zip(wave, iteration_outputs):
+                    if records is not None:
+                        self._process_iteration_results(records, iteration)
+                    progress.update()
+                
+                if self.adaptive:
+                    converged = self._deselect_converged(wave[-1])
+                    if converged:
+                        logger.info(f"{len(converged)} tests converged, skipping them from now on")
+                        self._converged.update(converged)
+                        self._update_selection()
+                    if self._selection is not None and not self._selection:
+                        logger.info("All tests converged")
+                        break
+        progress.close()
+        
+        if self.execution_mode == "pool":
+            for iteration in range(self.iterations):
+                shutil.rmtree(TEMP_DIR / f"pytest_{self.output_file.stem}_{iteration}", ignore_errors=True)
+
+    def _create_executor(self, workers: int) -> Executor:
+        """
+        Create the executor that runs the iterations of a wave.
 
         Args:
-            iteration_results: Results from pytest JSON output
-            all_tests: Set of all test IDs discovered
-            test_results: Dictionary mapping test IDs to pass/fail results
+            workers: Number of iterations to run concurrently
+
+        Returns:
+            A process pool of warmed-up pytest workers in "pool" mode, otherwise
+            a thread pool driving subprocesses
+        """
+        if self.execution_mode != "pool":
+            return ThreadPoolExecutor(max_workers=workers)
+        # Forked workers share the modules already imported by the collection here copy-on-write
+        if "fork" in multiprocessing.get_all_start_methods():
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+        # Workers started from a fresh interpreter warm up with a collection of their own
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_pool_worker,
+            initargs=(self._selection_args(use_file=False), self._test_root()),
+        )
+
+    def _deselect_converged(self, iteration: int) -> List[str]:
+        """
+        Find tests whose outcome has converged and need no further runs.
+
+        A test converges once it has passed, or failed, in every one of at least
+        ADAPTIVE_MIN_RUNS runs.
+
+        Args:
+            iteration: Last iteration that has been processed
+
+        Returns:
+            Node IDs of tests that converged since the last check
+        """
+        if iteration + 1 >= self.iterations:
+            return []
+        num_tests = len(self._test_index)
+        runs = self._runs[:num_tests]
+        passes = self._pass_count[:num_tests]
+        unanimous = (runs >= ADAPTIVE_MIN_RUNS) & ((passes == 0) | (passes == runs))
+        return [
+            test_id
+            for test_id, row in self._test_index.items()
+            if unanimous[row] and test_id not in self._converged
+        ]
+
+    def _run_iteration(self, iteration: int) -> Optional[List[TestRecord]]:
         """
-        # Extract test results from pytest JSON output
-        if "tests" not in iteration_results:
-            logger.warning("No tests found in iteration results")
+        Run the test suite once in a pytest subprocess.
+
+        Each iteration gets its own JSON report file and --basetemp directory,
+        so concurrent iterations do not collide. Where /dev/fd is available the
+        report file is an anonymous temp file handed to pytest by descriptor, so
+        it never needs a name on disk or an unlink afterwards.
+
+        Args:
+            iteration: Zero-based iteration number
+
+        Returns:
+            Test records from the pytest JSON report, or None if the iteration failed
+        """
+        logger.info(f"Starting iteration {iteration + 1}/{self.iterations}")
+        
+        # Create temporary locations for this iteration
+        run_id = f"{self.output_file.stem}_{iteration}"
+        report = tempfile.TemporaryFile(dir=TEMP_DIR) if REPORT_VIA_FD else None
+        report_path = f"/dev/fd/{report.fileno()}" if report else TEMP_DIR / f"temp_results_{run_id}.json"
+        basetemp = TEMP_DIR / f"pytest_{run_id}"
+        
+        # Run pytest with JSON output, loading only the plugins we need
+        pytest_args = [
+            "-q",
+            *SUBPROCESS_PYTEST_OVERRIDES,
+            "-p", "pytest_jsonreport.plugin",
+            "-p", "no:cacheprovider",
+            "-p", "no:html",
+            "-p", "no:metadata",
+            "--json-report",
+            f"--json-report-file={report_path}",
+            f"--basetemp={basetemp}",
+            "--no-header",
+            "--no-summary",
+        ]
+        for plugin in PYTEST_PLUGINS:
+            pytest_args += ["-p", plugin]
+        pytest_args += self._selection_args(use_file=True)
+        
+        # Skip entry-point plugin discovery; the .pytest_cache is never reused across iterations
+        env = {**os.environ, "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1"}
+        
+        # Back off while recent runs keep hitting resource errors
+        if self._backoff:
+            time.sleep(self._backoff)
+        
+        try:
+            # Run pytest as a subprocess to isolate test runs
+            result = subprocess.run(
+                [sys.executable, "-m", "pytest"] + pytest_args,
+                capture_output=True,
+                text=True,
+                check=False,
+                env=env,
+                pass_fds=(report.fileno(),) if report else (),
+            )
+            self._update_backoff(result.stdout + result.stderr)
+            
+            # Read back the JSON report pytest wrote
+            if report:
+                report.seek(0)
+                report_data = report.read()
+            else:
+                report_data = report_path.read_bytes() if report_path.exists() else b""
+            if not report_data:
+                logger.error(f"Results file not found for iteration {iteration + 1}")
+                return None
+            # Decoding runs on this worker thread, overlapping the other iterations
+            records = _parse_report_records(report_data)
+            if not records:
+                logger.warning("No tests found in iteration results")
+            return records
+        except Exception as e:
+            logger.error(f"Error running tests in iteration {iteration + 1}: {e}")
+            return None
+        finally:
+            # Clean up temporary files
+            if report:
+                report.close()
+            else:
+                report_path.unlink(missing_ok=True)
+            shutil.rmtree(basetemp, ignore_errors=True)
+
+    def _update_backoff(self, output: str) -> None:
+        """
+        Adjust the pause before the next iteration from the output of the last one.
+
+        Args:
+            output: Captured stdout and stderr of the pytest run
+        """
+        if not self.inter_iteration_sleep:
             return
+        if any(marker in output for marker in RESOURCE_ERROR_MARKERS):
+            self._backoff = min(max(self._backoff * 2, self.inter_iteration_sleep), MAX_INTER_ITERATION_SLEEP)
+            logger.warning(f"Resource errors in the last iteration, pausing {self._backoff:.1f}s between iterations")
+        else:
+            self._backoff = 0.0
+
+    def _run_iteration_inprocess(self, iteration: int) -> Optional[List[TestRecord]]:
+        """
+        Run the test suite once inside this process with pytest.main().
+
+        Test modules imported by the run are dropped from sys.modules afterwards,
+        so every iteration starts from freshly imported module state.
+
+        Args:
+            iteration: Zero-based iteration number
+
+        Returns:
+            Test records captured by the collector, or None if the iteration failed
+        """
+        logger.info(f"Starting iteration {iteration + 1}/{self.iterations}")
+        collector = ResultCollector()
+        modules_before = set(sys.modules)
+        try:
+            pytest.main(self._inprocess_args(iteration), plugins=[collector])
+            return collector.records
+        except Exception as e:
+            logger.error(f"Error running tests in iteration {iteration + 1}: {e}")
+            return None
+        finally:
+            _unload_test_modules(self._test_root(), modules_before)
+            shutil.rmtree(TEMP_DIR / f"pytest_{self.output_file.stem}_{iteration}", ignore_errors=True)
+
+    def _inprocess_args(self, iteration: int) -> List[str]:
+        """
+        Build the pytest.main() arguments for one in-process iteration.
+
+        Args:
+            iteration: Zero-based iteration number
+
+        Returns:
+            pytest arguments with a --basetemp directory unique to the iteration
+        """
+        basetemp = TEMP_DIR / f"pytest_{self.output_file.stem}_{iteration}"
+        return [
+            *PYTEST_OVERRIDES,
+            "-p", "no:cacheprovider",
+            "-p", "no:terminal",
+            f"--basetemp={basetemp}",
+            *self._selection_args(use_file=False),
+        ]
+
+    def _test_root(self) -> Path:
+        """Return the directory holding the test modules."""
+        test_root = self.test_path.resolve()
+        return test_root.parent if test_root.is_file() else test_root
+
+    def _get_test_row(self, test_id: str) -> int:
+        """
+        Get the matrix row of a test, registering it on first sight.
+
+        Args:
+            test_id: Test node ID
+
+        Returns:
+            Row index of the test in the outcome matrices
+        """
+        row = self._test_index.get(test_id)
+        if row is not None:
+            return row
         
-        for test_data in iteration_results["tests"]:
-            # Get test ID (nodeid in pytest)
-            test_id = test_data.get("nodeid", "")
+        row = self._test_index[test_id] = len(self._test_index)
+        if row == len(self._passed):
+            # Grow geometrically so registering K tests costs O(K) copies overall
+            extra = np.zeros((max(64, row), self.iterations), dtype=np.uint8)
+            self._passed = np.concatenate([self._passed, extra])
+            self._seen = np.concatenate([self._seen, extra])
+            self._pass_count = np.concatenate([self._pass_count, np.zeros(len(extra), dtype=np.int32)])
+            self._runs = np.concatenate([self._runs, np.zeros(len(extra), dtype=np.int32)])
+        self._logs.append([])
+        return row
+
+    def _process_iteration_results(self, records: List[TestRecord], iteration: int) -> None:
+        """
+        Process results from a single test iteration.
+
+        Args:
+            records: (nodeid, outcome, failure log) tuples for each test run
+            iteration: Zero-based iteration number the records belong to
+        """
+        # Bind hot lookups to locals once rather than per record
+        test_index = self._test_index
+        get_test_row = self._get_test_row
+        intern_log = self._intern_log
+        logs = self._logs
+        rows: List[int] = []
+        outcomes: List[bool] = []
+        for test_id, outcome, log_text in records:
             if not test_id:
                 continue
             
-            # Add to set of all tests
-            all_tests.add(test_id)
-            
-            # Initialize list for this test if not already present
-            if test_id not in test_results:
-                test_results[test_id] = []
-            
             # Check test outcome - treat "passed" as True, anything else as False
-            passed = test_data.get("outcome") == "passed"
-            test_results[test_id].append(passed)
-            
-            # Store detailed information if not already present
-            if test_id not in self.results["tests"]:
-                # Get module and test name from test_id
-                test_parts = test_id.split("::")
-                module = test_parts[0] if len(test_parts) >= 1 else ""
-                test_name = test_parts[-1] if len(test_parts) >= 2 else test_id
-                
-                self.results["tests"][test_id] = {
-                    "id": test_id,
-                    "module": module,
-                    "name": test_name,
-                    "results": [],
-                    "passes": 0,
-                    "failures": 0,
-                    "flaky": False,
-                    "flaky_score": 0.0,
-                    "always_passes": False,
-                    "always_fails": False,
-                    "logs": [],
-                }
-                
-            # Store test outcome and logs for this iteration
-            self.results["tests"][test_id]["results"].append(passed)
+            passed = outcome == "passed"
+            row = test_index[test_id] if test_id in test_index else get_test_row(test_id)
+            rows.append(row)
+            outcomes.append(passed)
             
             # Store log information if available
-            if "call" in test_data:
-                log_text = test_data["call"].get("longrepr", "")
-                if log_text and not passed:  # Only store logs for failures
-                    self.results["tests"][test_id]["logs"].append({
-                        "iteration": len(test_results[test_id]) - 1,
-                        "log": log_text
-                    })
-
-    def _calculate_flakiness_metrics(
-        self,
-        all_tests: Set[str],
-        test_results: Dict[str, List[bool]],
-    ) -> None:
+            if log_text and not passed:  # Only store logs for failures
+                logs[row].append({
+                    "iteration": iteration,
+                    "log_ref": intern_log(log_text)
+                })
+        
+        # Record the whole iteration in a few array operations
+        row_array = np.array(rows, dtype=np.intp)
+        passed_array = np.array(outcomes, dtype=np.uint8)
+        self._passed[row_array, iteration] = passed_array
+        self._seen[row_array, iteration] = 1
+        np.add.at(self._pass_count, row_array, passed_array)
+        np.add.at(self._runs, row_array, 1)
+
+    def _intern_log(self, log_text: str) -> int:
         """
-        Calculate flakiness metrics for all tests.
+        Store a failure log once and return its index in the log bodies.
 
         Args:
-            all_tests: Set of all test IDs discovered
-            test_results: Dictionary mapping test IDs to pass/fail results
-        """
-        # Initialize counters for summary
-        total_tests = len(all_tests)
-        flaky_tests = 0
-        stable_tests = 0
-        always_pass = 0
-        always_fail = 0
-        
-        for test_id in all_tests:
-            # Skip tests that weren't run in all iterations
-            if len(test_results.get(test_id, [])) < self.iterations:
-                logger.warning(f"Test {test_id} was not run in all iterations, results may be incomplete")
+            log_text: Failure log of a test run
+
+        Returns:
+            Index of the log in results["log_bodies"]
+        """
+        digest = hashlib.blake2b(log_text.encode("utf-8"), digest_size=8).hexdigest()
+        index = self._log_pool.get(digest)
+        if index is None:
+            log_bodies = self.results["log_bodies"]
+            index = self._log_pool[digest] = len(log_bodies)
+            log_bodies.append(log_text)
+        return index
+
+    def _calculate_flakiness_metrics(self) -> None:
+        """
+        Calculate flakiness metrics for all tests in one vectorized pass.
+
+        The per-test result records are built here, once, from the columnar state.
+        Only flaky and incomplete tests get a full record with per-iteration
+        results and logs; stable tests are stored as a compact verdict.
+        """
+        num_tests = len(self._test_index)
+        passed = self._passed[:num_tests]
+        seen = self._seen[:num_tests].astype(bool)
+        
+        # Runs and passes are accumulated per iteration, so only failures are derived here
+        runs = self._runs[:num_tests].astype(np.int64)
+        passes = self._pass_count[:num_tests].astype(np.int64)
+        failures = runs - passes
+        complete = runs >= self.iterations
+        
+        # Converged tests stopped early on purpose, so their verdict is complete
+        for test_id in self._converged:
+            complete[self._test_index[test_id]] = True
+        
+        # A test is flaky when it has some passes and some failures
+        always_passes = passes == runs
+        always_fails = failures == runs
+        is_flaky = ~always_passes & ~always_fails
+        
+        # Flakiness rate R(t) = failures / executions
+        total_runs = np.maximum(runs, 1)
+        flakiness_rates = np.round(failures / total_runs, 4)
+        
+        # Previous symmetric score (0.0 = stable, 1.0 = 50/50 split), kept for compatibility
+        symmetric_scores = np.round(np.where(is_flaky, 2.0 * np.minimum(passes, failures) / total_runs, 0.0), 4)
+        
+        # Convert to Python values in bulk rather than per element in the loop
+        passes_list = passes.tolist()
+        failures_list = failures.tolist()
+        flaky_list = is_flaky.tolist()
+        rates_list = flakiness_rates.tolist()
+        symmetric_list = symmetric_scores.tolist()
+        always_passes_list = always_passes.tolist()
+        always_fails_list = always_fails.tolist()
+        # Only flaky or incomplete tests need a full record with results and logs
+        full_record_list = (is_flaky | ~complete).tolist()
+        
+        tests: Dict[str, Dict[str, Any]] = {}
+        for test_id, row in self._test_index.items():
+            if not full_record_list[row]:
+                # Stable tests get a compact record: their verdict is all there is to show
+                test_data = tests[test_id] = {
+                    "id": test_id,
+                    "passes": passes_list[row],
+                    "failures": failures_list[row],
+                    "flaky": False,
+                    "always_passes": always_passes_list[row],
+                    "always_fails": always_fails_list[row],
+                }
+                if test_id in self._cached_tests:
+                    test_data["cached"] = True
+                if test_id in self._converged:
+                    test_data["converged"] = True
                 continue
             
-            # Count passes and failures
-            results = test_results[test_id]
-            passes = sum(results)
-            failures = len(results) - passes
-            
-            # Update test results
-            self.results["tests"][test_id]["passes"] = passes
-            self.results["tests"][test_id]["failures"] = failures
+            # Get module and test name from test_id
+            module, test_name = _parse_nodeid(test_id)
+            test_data = tests[test_id] = {
+                "id": test_id,
+                "module": module,
+                "name": test_name,
+                "results": passed[row][seen[row]].astype(bool).tolist(),
+                "passes": 0,
+                "failures": 0,
+                "flaky": False,
+                "flaky_score": 0.0,
+                "symmetric_flaky_score": 0.0,
+                "always_passes": False,
+                "always_fails": False,
+                "logs": self._logs[row],
+            }
             
-            # Determine if test is flaky (some passes, some failures)
-            is_flaky = 0 < passes < len(results)
-            
-            # Calculate flakiness score (0.0 = stable, 1.0 = maximally flaky)
-            if passes == 0 or passes == len(results):
-                flaky_score = 0.0  # Always passes or always fails = not flaky
-            else:
-                # Most flaky when pass/fail ratio is close to 50/50
-                flaky_score = 2.0 * min(passes, failures) / len(results)
+            # Leave default metrics for tests that weren't run in all iterations
+            if not complete[row]:
+                logger.warning(f"Test {test_id} was not run in all iterations, results may be incomplete")
+                continue
             
             # Update test flakiness information
-            self.results["tests"][test_id]["flaky"] = is_flaky
-            self.results["tests"][test_id]["flaky_score"] = round(flaky_score, 4)
-            self.results["tests"][test_id]["always_passes"] = passes == len(results)
-            self.results["tests"][test_id]["always_fails"] = failures == len(results)
-            
-            # Update summary counters
-            if is_flaky:
-                flaky_tests += 1
-            else:
-                stable_tests += 1
-                if passes == len(results):
-                    always_pass += 1
-                elif failures == len(results):
-                    always_fail += 1
+            test_data["passes"] = passes_list[row]
+            test_data["failures"] = failures_list[row]
+            test_data["flaky"] = flaky_list[row]
+            test_data["flaky_score"] = rates_list[row]
+            test_data["symmetric_flaky_score"] = symmetric_list[row]
+            test_data["always_passes"] = always_passes_list[row]
+            test_data["always_fails"] = always_fails_list[row]
+            if test_id in self._cached_tests:
+                test_data["cached"] = True
+            if test_id in self._converged:
+                test_data["converged"] = True
+        self.results["tests"] = tests
+        
+        # Summary counters only cover tests run in every iteration
+        flaky_tests = int((is_flaky & complete).sum())
+        stable_tests = int((~is_flaky & complete).sum())
+        always_pass = int((always_passes & complete).sum())
+        always_fail = int((always_fails & complete).sum())
+        total_tests = num_tests
         
         # Calculate overall suite stability percentage
         if total_tests > 0:
@@ -311,8 +961,7 @@ class FlakyDetector:
         Save test results to a JSON file.
         """
         try:
-            with open(self.output_file, "w") as f:
-                json.dump(self.results, f, indent=2)
+            write_json(self.results, self.output_file)
             logger.info(f"Results saved to {self.output_file}")
         except Exception as e:
             logger.error(f"Error saving results: {e}")
@@ -338,7 +987,7 @@ class FlakyDetector:
 
     def _generate_flakiness_chart(self, charts_dir: Path) -> None:
         """
-        Generate a bar chart showing flakiness scores.
+        Generate an SVG bar chart showing flakiness scores.
         
         Args:
             charts_dir: Directory to save chart
@@ -357,36 +1006,50 @@ class FlakyDetector:
         # Sort by flakiness score (descending)
         sorted_tests = sorted(flaky_tests.items(), key=lambda x: x[1], reverse=True)
         
-        # Prepare chart data
-        test_names = [f"{t.split('::')[-1]}" for t, _ in sorted_tests]
-        scores = [score for _, score in sorted_tests]
+        # Lay out one bar per test below a 0-1 score axis
+        bar_width, gap, plot_height = 40, 20, 300
+        left, top, bottom = 60, 50, 160
+        width = left + len(sorted_tests) * (bar_width + gap) + gap
+        height = top + plot_height + bottom
+        axis_y = top + plot_height
         
-        # Create bar chart
-        plt.figure(figsize=(12, 6))
-        bars = plt.bar(test_names, scores, color='salmon')
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'font-family="sans-serif" font-size="12">',
+            f'<text x="{width / 2}" y="25" text-anchor="middle" font-size="16">Flakiness Score by Test</text>',
+            f'<line x1="{left}" y1="{top}" x2="{left}" y2="{axis_y}" stroke="black"/>',
+            f'<line x1="{left}" y1="{axis_y}" x2="{width}" y2="{axis_y}" stroke="black"/>',
+            f'<text x="15" y="{top + plot_height / 2}" text-anchor="middle" '
+            f'transform="rotate(-90 15 {top + plot_height / 2})">Flakiness Score (0-1)</text>',
+        ]
+        for tick in (0.0, 0.25, 0.5, 0.75, 1.0):
+            y = axis_y - tick * plot_height
+            parts.append(f'<text x="{left - 5}" y="{y + 4}" text-anchor="end">{tick:.2f}</text>')
         
-        # Add labels and title
-        plt.xlabel('Test Name')
-        plt.ylabel('Flakiness Score (0-1)')
-        plt.title('Flakiness Score by Test')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        
-        # Add values above bars
-        for bar, score in zip(bars, scores):
-            plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.01,
-                    f'{score:.2f}', ha='center', va='bottom')
+        for i, (test_id, score) in enumerate(sorted_tests):
+            x = left + gap + i * (bar_width + gap)
+            bar_height = score * plot_height
+            center = x + bar_width / 2
+            parts.append(
+                f'<rect x="{x}" y="{axis_y - bar_height}" width="{bar_width}" height="{bar_height}" fill="salmon"/>'
+            )
+            # Add values above bars and test names below the axis
+            parts.append(f'<text x="{center}" y="{axis_y - bar_height - 4}" text-anchor="middle">{score:.2f}</text>')
+            parts.append(
+                f'<text x="{center}" y="{axis_y + 15}" text-anchor="end" '
+                f'transform="rotate(-45 {center} {axis_y + 15})">{escape(_parse_nodeid(test_id)[1])}</text>'
+            )
+        parts.append("</svg>")
         
         # Save chart
-        chart_path = charts_dir / "flakiness_scores.png"
-        plt.savefig(chart_path)
-        plt.close()
+        chart_path = charts_dir / "flakiness_scores.svg"
+        chart_path.write_text("\n".join(parts), encoding="utf-8")
         
         logger.info(f"Flakiness chart saved to {chart_path}")
 
     def _generate_stability_chart(self, charts_dir: Path) -> None:
         """
-        Generate a pie chart showing test stability breakdown.
+        Generate an SVG pie chart showing test stability breakdown.
         
         Args:
             charts_dir: Directory to save chart
@@ -396,24 +1059,48 @@ class FlakyDetector:
         
         # Prepare chart data
         labels = ['Always Pass', 'Always Fail', 'Flaky Tests']
-        sizes = [summary["always_pass"], summary["always_fail"], summary["flaky_tests"]]
+        sizes = np.array([summary["always_pass"], summary["always_fail"], summary["flaky_tests"]], dtype=float)
         colors = ['#4CAF50', '#F44336', '#FFC107']  # Green, Red, Yellow
         
-        # Create pie chart
-        plt.figure(figsize=(8, 8))
-        plt.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', 
-                startangle=90, shadow=True)
-        plt.axis('equal')
-        plt.title('Test Stability Breakdown')
+        if not sizes.sum():
+            logger.info("No tests to chart")
+            return
+        
+        # Slice boundaries as fractions of the circle, starting at 12 o'clock
+        bounds = np.concatenate([[0.0], np.cumsum(sizes) / sizes.sum()])
+        cx, cy, r = 200, 220, 150
+        
+        def point(fraction: float) -> Tuple[float, float]:
+            angle = 2 * np.pi * fraction
+            return cx + r * np.sin(angle), cy - r * np.cos(angle)
+        
+        parts = [
+            '<svg xmlns="http://www.w3.org/2000/svg" width="560" height="400" font-family="sans-serif" font-size="12">',
+            '<text x="280" y="30" text-anchor="middle" font-size="16">Test Stability Breakdown</text>',
+        ]
+        for i, (label, size, color) in enumerate(zip(labels, sizes, colors)):
+            start, end = bounds[i], bounds[i + 1]
+            if size == sizes.sum():
+                parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}"/>')
+            elif size:
+                (x1, y1), (x2, y2) = point(start), point(end)
+                large_arc = int(end - start > 0.5)
+                parts.append(
+                    f'<path d="M{cx},{cy} L{x1:.2f},{y1:.2f} A{r},{r} 0 {large_arc},1 {x2:.2f},{y2:.2f} Z" '
+                    f'fill="{color}" stroke="white"/>'
+                )
+            # Legend entry with the slice's share of the suite
+            legend_y = 120 + i * 25
+            parts.append(f'<rect x="390" y="{legend_y - 11}" width="14" height="14" fill="{color}"/>')
+            parts.append(f'<text x="410" y="{legend_y}">{label} ({size / sizes.sum():.1%})</text>')
+        parts.append("</svg>")
         
         # Save chart
-        chart_path = charts_dir / "test_stability.png"
-        plt.savefig(chart_path)
-        plt.close()
+        chart_path = charts_dir / "test_stability.svg"
+        chart_path.write_text("\n".join(parts), encoding="utf-8")
         
         logger.info(f"Stability chart saved to {chart_path}")
 
-
 def main():
     """
     Main function for running the flaky test detector from command line.
@@ -437,6 +1124,36 @@ def main():
         default=None,
         help="Output file path (default: auto-generated in results directory)"
     )
+    parser.add_argument(
+        "--parallel", 
+        type=int, 
+        default=PARALLEL_EXECUTIONS,
+        help=f"Number of test iterations to run concurrently (default: {PARALLEL_EXECUTIONS})"
+    )
+    parser.add_argument(
+        "--mode", 
+        choices=EXECUTION_MODES, 
+        default=EXECUTION_MODE,
+        help=f"How to run each iteration (default: {EXECUTION_MODE})"
+    )
+    parser.add_argument(
+        "--use-cache", 
+        action=argparse.BooleanOptionalAction, 
+        default=RESULT_CACHE_ENABLED,
+        help="Skip tests whose source is unchanged since they were last stable"
+    )
+    parser.add_argument(
+        "--adaptive", 
+        action=argparse.BooleanOptionalAction, 
+        default=ADAPTIVE_SAMPLING,
+        help=f"Stop re-running tests after {ADAPTIVE_MIN_RUNS} unanimous runs"
+    )
+    parser.add_argument(
+        "--sleep", 
+        type=float, 
+        default=INTER_ITERATION_SLEEP,
+        help=f"Initial backoff in seconds after an iteration hits resource errors, 0 to disable (default: {INTER_ITERATION_SLEEP})"
+    )
     args = parser.parse_args()
     
     # Initialize and run flaky detector
@@ -444,6 +1161,11 @@ def main():
         test_path=args.path,
         iterations=args.iterations,
         output_file=args.output,
+        max_parallel=args.parallel,
+        execution_mode=args.mode,
+        use_cache=args.use_cache,
+        adaptive=args.adaptive,
+        inter_iteration_sleep=args.sleep,
     )
     results = detector.run_tests()
     
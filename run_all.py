@@ -165,8 +165,8 @@ def print_summary(results: Dict[str, Any], insights: Dict[str, Any]) -> None:
                     print(f"   └─ AI Insight: {root_cause_first_line}")
                 
                 if test_insight.get("recommendations"):
-                    root_cause_first_line = test_insight['root_cause'].split('\n')[0]
-                    print(f"   └─ AI Insight: {root_cause_first_line}")
+                    recommendation_first_line = test_insight['recommendations'].split('\n')[0]
+                    print(f"   └─ Recommendation: {recommendation_first_line}")
     
     print("\nResults saved to:", results.get("metadata", {}).get("output_file", "Unknown"))
     
@@ -0,0 +1,20 @@
+"""
+Shared fixtures for the FlakyTestX sample tests.
+"""
+
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _fast_sleep(monkeypatch):
+    """
+    Turn time.sleep into a no-op when FLAKY_FAST=1.
+
+    The sample tests only sleep to widen their race windows; the random
+    gates inside them remain the source of flakiness.
+    """
+    if os.getenv("FLAKY_FAST") == "1":
+        monkeypatch.setattr(time, "sleep", lambda *_: None)
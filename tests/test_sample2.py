@@ -9,36 +9,24 @@ import pytest
 import time
 import random
 import os
-import tempfile
 import threading
 from unittest import mock
 
 
-# Global counter to simulate shared resource issues
-_counter = 0
-_counter_lock = threading.Lock()
+@pytest.fixture
+def counter():
+    """A shared counter and its lock, fresh for each test."""
+    return {"value": 0, "lock": threading.Lock()}
 
 
-class TestSample2:
-    """Sample test class demonstrating flaky tests with common patterns."""
+@pytest.fixture(scope="module")
+def mock_db():
+    """A mocked database, built once per module and reset by each test that uses it."""
+    yield mock.MagicMock()
 
-    def setup_method(self):
-        """Set up test fixtures, if any."""
-        # Create a temporary directory for file operations
-        self.temp_dir = tempfile.TemporaryDirectory()
-        
-        # Create a test file
-        self.test_file_path = os.path.join(self.temp_dir.name, "test.txt")
-        with open(self.test_file_path, "w") as f:
-            f.write("Test data")
 
-    def teardown_method(self):
-        """Tear down test fixtures, if any."""
-        # Cleanup temporary directory
-        try:
-            self.temp_dir.cleanup()
-        except:
-            pass  # Intentionally ignore cleanup errors to demonstrate issues
+class TestSample2:
+    """Sample test class demonstrating flaky tests with common patterns."""
 
     def test_multiplication(self):
         """A stable test that always passes."""
@@ -46,56 +34,61 @@ class TestSample2:
         assert 5 * 5 == 25
 
     @pytest.mark.flaky
-    def test_file_operations(self):
+    def test_file_operations(self, tmp_path):
         """
         A flaky test with file operations.
         
         This test is intentionally flaky due to file handling issues.
         Sometimes it will fail due to file locks or timing issues.
         """
-        # Create a new file with random content
-        file_path = os.path.join(self.temp_dir.name, f"test_file_{random.randint(1000, 9999)}.txt")
+        # Create a new file with random content in pytest's per-test directory
+        file_path = os.path.join(tmp_path, f"test_file_{random.randint(1000, 9999)}.txt")
         
         try:
-            # Write to file
-            with open(file_path, "w") as f:
-                f.write(f"Test content {random.randint(1, 100)}")
-            
-            # Simulate a race condition with file operations
-            # Sometimes we don't wait long enough for file operations to complete
-            if random.random() < 0.3:  # 30% chance of timing issue
-                time.sleep(0.01)  # Too short delay
-            else:
-                time.sleep(0.1)  # Adequate delay
-            
-            # Read from file
-            with open(file_path, "r") as f:
-                content = f.read()
-            
-            assert "Test content" in content
-            
-            # Attempt to remove the file, but occasionally fail
-            if random.random() < 0.2:  # 20% chance of failure
-                # Simulate another process keeping the file open
-                dummy_handle = open(file_path, "r")
-                os.remove(file_path)  # This might fail with "file in use" error
-                dummy_handle.close()
-            else:
-                os.remove(file_path)
+            # Write to file and read it back through one descriptor, skipping the buffered file objects
+            fd = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, f"Test content {random.randint(1, 100)}".encode())
+                
+                # Simulate a race condition with file operations
+                # Sometimes we don't wait long enough for file operations to complete
+                if random.random() < 0.3:  # 30% chance of timing issue
+                    time.sleep(0.01)  # Too short delay
+                else:
+                    time.sleep(0.1)  # Adequate delay
+                
+                # Read from file
+                os.lseek(fd, 0, os.SEEK_SET)
+                content = os.read(fd, 4096).decode()
+                
+                assert "Test content" in content
+                
+                # Attempt to remove the file, but occasionally fail
+                if random.random() < 0.2:  # 20% chance of failure
+                    # Simulate another process keeping the file open
+                    dummy_fd = os.dup(fd)
+                    os.unlink(file_path)  # This might fail with "file in use" error
+                    os.close(dummy_fd)
+                else:
+                    os.unlink(file_path)
+            finally:
+                os.close(fd)
                 
         except Exception as e:
             pytest.fail(f"File operation failed: {str(e)}")
 
     @pytest.mark.flaky
-    def test_database_query(self):
+    def test_database_query(self, mock_db):
         """
         A flaky test with database connection issues.
         
         This test simulates database connection problems that make the test flaky.
         The test will randomly fail when the "database connection" is unstable.
         """
-        # Mock a database with connection issues
-        mock_db = mock.MagicMock()
+        # Reuse the module's mock database, clearing what earlier runs configured
+        mock_db.reset_mock(return_value=True, side_effect=True)
+        mock_db.connect.reset_mock(return_value=True, side_effect=True)
+        mock_db.query.reset_mock(return_value=True, side_effect=True)
         
         # Simulate connection issues with 40% probability
         if random.random() < 0.4:
@@ -114,48 +107,51 @@ class TestSample2:
             assert len(result) == 1
             assert result[0]["name"] == "Test User"
 
-    def test_counter_increment(self):
+    def test_counter_increment(self, counter):
         """
         A test with shared resource access.
         
         This test is stable because it properly uses a lock when accessing
         shared resources, unlike the flaky version below.
         """
-        global _counter, _counter_lock
-        
         # Safely increment counter with lock
-        with _counter_lock:
-            initial_value = _counter
-            _counter += 1
-            final_value = _counter
+        with counter["lock"]:
+            initial_value = counter["value"]
+            counter["value"] += 1
+            final_value = counter["value"]
             
         assert final_value == initial_value + 1
 
     @pytest.mark.flaky
-    def test_flaky_counter_increment(self):
+    def test_flaky_counter_increment(self, counter):
         """
         A flaky test with shared resource access issues.
         
-        This test intentionally has a race condition when accessing a shared counter.
+        This test intentionally has a race condition: two threads increment the
+        shared counter without the lock, and sometimes both read it before
+        either writes it back.
         """
-        global _counter
-        
-        # Get initial counter value without lock
-        initial_value = _counter
-        
-        # Simulate work that takes time
-        time.sleep(random.uniform(0.01, 0.05))
+        # 30% of the time both threads meet between their read and their write
+        racing = random.random() < 0.3
+        race_window = threading.Barrier(2, timeout=5)
         
-        # Increment without lock - possible race condition
-        _counter += 1
+        def increment():
+            # Increment without lock - possible race condition
+            value = counter["value"]
+            if racing:
+                race_window.wait()
+            counter["value"] = value + 1
         
-        # More simulated work
-        time.sleep(random.uniform(0.01, 0.05))
+        threads = [threading.Thread(target=increment) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
         
-        # Verify counter was incremented by 1 - can fail if another test changed it
+        # Verify both increments landed - fails when one update was lost
         try:
-            assert _counter == initial_value + 1
+            assert counter["value"] == 2
         except AssertionError:
             # Sometimes we'll get lucky and pass even with the race condition
             if random.random() < 0.7:  # 70% chance to actually fail when race condition exists
-                raise
\ No newline at end of file
+                raise
@@ -6,5 +6,7 @@ and other helper functions used throughout the application.
 """
 
 from .logger import setup_logger, get_logger
+from .serialization import dumps_json, iter_jsonl, parse_json, read_json, resolve_log_refs, write_json
 
-__all__ = ["setup_logger", "get_logger"]
\ No newline at end of file
+__all__ = ["setup_logger", "get_logger", "dumps_json", "iter_jsonl", "parse_json", "read_json",
+           "resolve_log_refs", "write_json"]
\ No newline at end of file
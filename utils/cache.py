@@ -0,0 +1,392 @@
+"""
+Caching utilities for FlakyTestX.
+
+This module provides caches that let the AI insight generator reuse
+previous LLM responses instead of issuing new requests.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from config import (
+    RESULTS_DIR,
+    SEMANTIC_CACHE_THRESHOLD,
+    CLUSTER_CACHE_THRESHOLD,
+    EMBEDDING_MODEL,
+)
+from .logger import get_logger
+from .serialization import dumps_json, parse_json, read_json, write_json
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=None)
+def load_embedding_model(model_name: str = EMBEDDING_MODEL):
+    """
+    Load a SentenceTransformer model once per process.
+
+    Args:
+        model_name: Name of the model to load
+
+    Returns:
+        The loaded model, or None if sentence-transformers is unavailable
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence-transformers not installed. Embedding caches disabled.")
+        return None
+    try:
+        return SentenceTransformer(model_name)
+    except Exception as e:
+        logger.error(f"Failed to load embedding model {model_name}: {e}")
+        return None
+
+
+def embed_texts(model, texts: List[str]) -> np.ndarray:
+    """
+    Embed several texts in one batched encoder call.
+
+    Args:
+        model: SentenceTransformer model from load_embedding_model
+        texts: Texts to embed
+
+    Returns:
+        Matrix of unit-length embeddings, one row per text
+    """
+    return model.encode(texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+
+
+def _replace_test_name(text: str, old_name: str, new_name: str) -> str:
+    """Replace whole-word occurrences of a test name, so test_a leaves test_abc alone."""
+    return re.sub(rf"(?<!\w){re.escape(old_name)}(?!\w)", lambda _: new_name, text)
+
+
+def _adapt_response(response: str, old_name: str, new_name: str) -> str:
+    """
+    Rewrite a cached AI response for another test.
+
+    Structured responses are decoded so only their field values are rewritten
+    and the result is re-encoded as valid JSON. Plain-text responses are
+    rewritten as they are.
+
+    Args:
+        response: Cached response text
+        old_name: Test name the response was generated for
+        new_name: Test name to substitute
+
+    Returns:
+        The response with the test name replaced
+    """
+    try:
+        fields = parse_json(response)
+    except ValueError:
+        fields = None
+    if not isinstance(fields, dict):
+        return _replace_test_name(response, old_name, new_name)
+    adapted = {
+        key: _replace_test_name(value, old_name, new_name) if isinstance(value, str) else value
+        for key, value in fields.items()
+    }
+    return dumps_json(adapted).decode("utf-8")
+
+
+class PromptDiskCache:
+    """
+    Exact-match cache of AI responses keyed by a hash of the request parameters.
+    """
+
+    def __init__(self, cache_file: Path = RESULTS_DIR / "cache" / "prompt_cache.json"):
+        """
+        Initialize the prompt cache.
+
+        Args:
+            cache_file: Path to the JSON file backing the cache
+        """
+        self.cache_file = Path(cache_file)
+        self._entries: Dict[str, str] = {}
+        self._dirty = False
+        self._load()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model: Model name
+            prompt: Prompt text
+            temperature: Sampling temperature
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            {"model": model, "prompt": prompt, "temperature": temperature},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _load(self) -> None:
+        """Load cached responses from disk."""
+        if not self.cache_file.exists():
+            return
+        try:
+            self._entries = read_json(self.cache_file)
+        except Exception as e:
+            logger.error(f"Error loading prompt cache: {e}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, if any."""
+        return self._entries.get(key)
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response under a key."""
+        self._entries[key] = response
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist the cache to disk if it changed."""
+        if not self._dirty:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            write_json(self._entries, self.cache_file, indent=False)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Error saving prompt cache: {e}")
+
+
+class SemanticInsightCache:
+    """
+    Reuses AI responses for error logs that are semantically similar to ones seen before.
+
+    Entries are keyed by a normalized sentence embedding of the error logs, so a
+    lookup is a single matrix-vector product against all stored embeddings.
+    """
+
+    def __init__(
+        self,
+        cache_path: Path = RESULTS_DIR / "cache" / "insight_cache",
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        model_name: str = EMBEDDING_MODEL,
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            cache_path: Base path for the cache files (.npz and .json are appended)
+            threshold: Minimum cosine similarity for a cache hit
+            model_name: SentenceTransformer model used for embeddings
+        """
+        self.vectors_file = Path(cache_path).with_suffix(".npz")
+        self.entries_file = Path(cache_path).with_suffix(".json")
+        self.threshold = threshold
+        self.model_name = model_name
+        self._model = load_embedding_model(model_name)
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Dict[str, Any]] = []
+        self.available = self._model is not None
+        if self.available:
+            self._load()
+
+    def _load(self) -> None:
+        """Load cached embeddings and entries from disk."""
+        if not (self.vectors_file.exists() and self.entries_file.exists()):
+            return
+        try:
+            with np.load(self.vectors_file) as data:
+                vectors = data["vectors"]
+            entries = read_json(self.entries_file)
+        except Exception as e:
+            logger.error(f"Error loading semantic cache: {e}")
+            return
+        if len(entries) != len(vectors):
+            logger.warning("Semantic cache files are out of sync, ignoring cache")
+            return
+        self._vectors = vectors
+        self._entries = entries
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several texts in one batched encoder call.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Matrix of normalized embeddings, one row per text
+        """
+        return embed_texts(self._model, texts)
+
+    def lookup(self, vector: np.ndarray, test_name: str) -> Optional[str]:
+        """
+        Find the most similar cached entry and adapt its response to the test.
+
+        Args:
+            vector: Normalized embedding to look up
+            test_name: Name of the test being analyzed
+
+        Returns:
+            The cached response with the original test name swapped for this
+            one if its similarity reaches the threshold, otherwise None
+        """
+        if self._vectors is None or not len(self._vectors):
+            return None
+        # Stored vectors are unit length, so the dot product is the cosine similarity
+        similarities = self._vectors @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        entry = self._entries[best]
+        # Entries saved before test names were stored only carry the test ID
+        source_name = entry.get("test_name") or entry["test_id"].split("::")[-1]
+        return _adapt_response(entry["response"], source_name, test_name)
+
+    def add(self, vector: np.ndarray, entry: Dict[str, Any]) -> None:
+        """
+        Add an entry to the cache.
+
+        Args:
+            vector: Normalized embedding of the entry
+            entry: JSON-serializable data to store
+        """
+        row = vector.reshape(1, -1).astype(np.float32)
+        self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+        self._entries.append(entry)
+
+    def save(self) -> None:
+        """Persist the cache to disk."""
+        if self._vectors is None:
+            return
+        try:
+            self.vectors_file.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(self.vectors_file, vectors=self._vectors)
+            write_json(self._entries, self.entries_file)
+        except Exception as e:
+            logger.error(f"Error saving semantic cache: {e}")
+
+
+class ClusterInsightCache:
+    """
+    Groups similar failures into clusters that share one canonical AI response.
+
+    Each cluster keeps a running-mean centroid of its members' embeddings. A new
+    failure close enough to a centroid reuses that cluster's response, with the
+    original test name swapped for the new one.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = RESULTS_DIR / "cache" / "clusters",
+        threshold: float = CLUSTER_CACHE_THRESHOLD,
+        model_name: str = EMBEDDING_MODEL,
+    ):
+        """
+        Initialize the cluster cache.
+
+        Args:
+            cache_dir: Directory holding the persisted clusters
+            threshold: Minimum cosine similarity to a centroid for a cache hit
+            model_name: SentenceTransformer model used for embeddings
+        """
+        self.centroids_file = Path(cache_dir) / "centroids.npz"
+        self.clusters_file = Path(cache_dir) / "clusters.json"
+        self.threshold = threshold
+        self._model = load_embedding_model(model_name)
+        self._centroids: Optional[np.ndarray] = None
+        self._clusters: List[Dict[str, Any]] = []
+        self.available = self._model is not None
+        if self.available:
+            self._load()
+
+    def _load(self) -> None:
+        """Load clusters from disk."""
+        if not (self.centroids_file.exists() and self.clusters_file.exists()):
+            return
+        try:
+            with np.load(self.centroids_file) as data:
+                centroids = data["centroids"]
+            clusters = read_json(self.clusters_file)
+        except Exception as e:
+            logger.error(f"Error loading cluster cache: {e}")
+            return
+        if len(clusters) != len(centroids):
+            logger.warning("Cluster cache files are out of sync, ignoring cache")
+            return
+        self._centroids = centroids
+        self._clusters = clusters
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several texts in one batched encoder call.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Matrix of normalized embeddings, one row per text
+        """
+        return embed_texts(self._model, texts)
+
+    def match(self, vector: np.ndarray, test_name: str) -> Optional[str]:
+        """
+        Find the closest cluster and, on a hit, add the test to it if it is not a member yet.
+
+        Args:
+            vector: Normalized embedding of the failure
+            test_name: Name of the test being analyzed
+
+        Returns:
+            The cluster's canonical response adapted to the test, or None on a miss
+        """
+        if self._centroids is None or not len(self._centroids):
+            return None
+        # Centroids are means of unit vectors, so normalize them for cosine similarity
+        norms = np.linalg.norm(self._centroids, axis=1)
+        similarities = (self._centroids @ vector) / np.maximum(norms, 1e-12)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+
+        cluster = self._clusters[best]
+        # Re-runs match the same tests again; only new members move the centroid
+        if test_name not in cluster["members"]:
+            cluster["members"].append(test_name)
+            count = len(cluster["members"])
+            self._centroids[best] += (vector - self._centroids[best]) / count
+        return _adapt_response(cluster["response"], cluster["canonical_test"], test_name)
+
+    def add(self, vector: np.ndarray, test_name: str, response: str) -> None:
+        """
+        Start a new cluster from a fresh AI response.
+
+        Args:
+            vector: Normalized embedding of the failure
+            test_name: Name of the test the response was generated for
+            response: AI response text
+        """
+        row = vector.reshape(1, -1).astype(np.float32)
+        self._centroids = row if self._centroids is None else np.vstack([self._centroids, row])
+        self._clusters.append({
+            "canonical_test": test_name,
+            "response": response,
+            "members": [test_name],
+        })
+
+    def save(self) -> None:
+        """Persist the clusters to disk."""
+        if self._centroids is None:
+            return
+        try:
+            self.centroids_file.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(self.centroids_file, centroids=self._centroids)
+            write_json(self._clusters, self.clusters_file)
+        except Exception as e:
+            logger.error(f"Error saving cluster cache: {e}")
@@ -5,18 +5,32 @@ This module provides functions for setting up and retrieving logger instances,
 with support for console and file output.
 """
 
+import atexit
 import logging
+import os
+import queue
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from logging.handlers import RotatingFileHandler
-from rich.logging import RichHandler
+from typing import TYPE_CHECKING, Dict, Optional
 
 # Import config settings for logging
 from config import LOG_LEVEL, LOG_FILE, VERBOSE_OUTPUT
 
-# Dictionary to store logger instances
-_loggers = {}
+if TYPE_CHECKING:
+    from logging.handlers import QueueHandler, QueueListener
+
+# Formatter shared by the log files
+_FILE_FMT = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+# Loggers with the default configuration are children of this one and share its handlers
+ROOT_LOGGER_NAME = "flakytestx"
+
+# RichHandler options that do not depend on the verbosity
+_RICH_HANDLER_KWARGS = {"rich_tracebacks": True, "markup": True}
+
+# Background listeners that own the file handlers, keyed by log file
+_listeners: Dict[str, "QueueListener"] = {}
 
 
 def setup_logger(
@@ -28,6 +42,10 @@ def setup_logger(
     """
     Set up and configure a logger instance.
 
+    Loggers are built once per combination of arguments and reused afterwards.
+    With the default configuration the logger is a child of the "flakytestx"
+    logger, so the whole process shares one set of handlers.
+
     Args:
         name: The name of the logger.
         log_file: The path to the log file. If None, only console logging is enabled.
@@ -37,56 +55,102 @@ def setup_logger(
     Returns:
         The configured logger instance.
     """
-    # If logger already exists, return it
-    if name in _loggers:
-        return _loggers[name]
+    # lru_cache needs hashable arguments, so the path is passed as a string
+    log_file_key = str(log_file) if log_file else None
+    if name != ROOT_LOGGER_NAME and (log_file, level, verbose) == (LOG_FILE, LOG_LEVEL, VERBOSE_OUTPUT):
+        # Child loggers propagate their records to the root's handlers
+        return _build_logger(ROOT_LOGGER_NAME, log_file_key, level, verbose).getChild(name)
+    return _build_logger(name, log_file_key, level, verbose)
+
+
+@lru_cache(maxsize=None)
+def _build_logger(name: str, log_file: Optional[str], level: str, verbose: bool) -> logging.Logger:
+    """Build a logger with its handlers; memoized by setup_logger's arguments."""
+    # Resolve the level once for the logger and its handlers
+    log_level = getattr(logging, level.upper())
 
     # Create logger and set level
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
+    logger.setLevel(log_level)
     logger.propagate = False
 
     # Clear any existing handlers
     logger.handlers = []
 
-    # Create console handler with rich formatting
+    # Create console handler with rich formatting, importing Rich only once a logger is built
+    from rich.logging import RichHandler
     console_handler = RichHandler(
-        rich_tracebacks=True,
-        markup=True,
+        **_RICH_HANDLER_KWARGS,
         show_time=verbose,
         show_path=verbose,
         omit_repeated_times=not verbose,
     )
-    console_handler.setLevel(getattr(logging, level.upper()))
+    console_handler.setLevel(log_level)
     logger.addHandler(console_handler)
 
-    # Create file handler if log_file is provided
+    # Create file handler if log_file is provided; callers only enqueue records for it
     if log_file:
         try:
-            # Create directory if it doesn't exist
-            log_file.parent.mkdir(parents=True, exist_ok=True)
-
-            # Configure file handler with rotation
-            file_handler = RotatingFileHandler(
-                log_file,
-                maxBytes=10 * 1024 * 1024,  # 10 MB
-                backupCount=5,
-                encoding="utf-8",
-            )
-            file_formatter = logging.Formatter(
-                "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            )
-            file_handler.setFormatter(file_formatter)
-            file_handler.setLevel(getattr(logging, level.upper()))
-            logger.addHandler(file_handler)
+            logger.addHandler(_get_queue_handler(log_file))
         except Exception as e:
             logger.error(f"Failed to create file handler: {e}")
 
-    # Store and return the logger
-    _loggers[name] = logger
     return logger
 
 
+@lru_cache(maxsize=None)
+def _get_queue_handler(log_file: str) -> "QueueHandler":
+    """
+    Set up the queue handler and background listener that write a log file.
+
+    All loggers writing the same file share the handler, so a single thread
+    does the formatting, writes and rotation for that file.
+
+    Args:
+        log_file: The path to the log file.
+
+    Returns:
+        The handler that enqueues records for the file.
+    """
+    # Create directory if it doesn't exist
+    Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+
+    # Configure file handler with rotation
+    from logging.handlers import QueueHandler, RotatingFileHandler
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=10 * 1024 * 1024,  # 10 MB
+        backupCount=5,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(_FILE_FMT)
+
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    _start_listener(log_file, queue_handler, file_handler)
+    return queue_handler
+
+
+def _start_listener(log_file: str, queue_handler: "QueueHandler", file_handler: logging.Handler) -> None:
+    """Start the thread draining a queue handler into the file handler, stopped at exit."""
+    from logging.handlers import QueueListener
+    listener = QueueListener(queue_handler.queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    _listeners[log_file] = listener
+
+
+def _restart_listeners_after_fork() -> None:
+    """Give a forked child fresh queues and listener threads, since neither survives fork."""
+    for log_file, listener in list(_listeners.items()):
+        queue_handler = _get_queue_handler(log_file)
+        queue_handler.queue = queue.SimpleQueue()
+        _start_listener(log_file, queue_handler, *listener.handlers)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listeners_after_fork)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get an existing logger by name or create a new one.
@@ -97,6 +161,4 @@ def get_logger(name: str) -> logging.Logger:
     Returns:
         The requested logger instance.
     """
-    if name in _loggers:
-        return _loggers[name]
     return setup_logger(name)
\ No newline at end of file
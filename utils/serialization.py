@@ -0,0 +1,129 @@
+"""
+JSON serialization utilities for FlakyTestX.
+
+This module reads and writes JSON files with orjson when it is installed,
+falling back to the standard library json module otherwise. NumPy arrays
+and scalars are serialized natively by both paths.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Union
+
+# Conditionally import orjson for faster parsing and serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert NumPy arrays and scalars for the standard library encoder."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def parse_json(data: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document held in memory.
+
+    Args:
+        data: JSON text
+
+    Returns:
+        The decoded JSON data
+
+    Raises:
+        ValueError: If the data is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode data as JSON.
+
+    Args:
+        obj: JSON-serializable data
+        indent: Whether to pretty-print with a two-space indent
+
+    Returns:
+        The encoded JSON as UTF-8 bytes
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option, default=_json_default)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode("utf-8")
+
+
+def read_json(path: Union[str, Path]) -> Any:
+    """
+    Load JSON data from a file.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        The decoded JSON data
+    """
+    with open(path, "rb") as f:
+        return parse_json(f.read())
+
+
+def write_json(obj: Any, path: Union[str, Path], indent: bool = True) -> None:
+    """
+    Write JSON data to a file.
+
+    Args:
+        obj: JSON-serializable data
+        path: Path to the output file
+        indent: Whether to pretty-print with a two-space indent
+    """
+    data = dumps_json(obj, indent=indent)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def iter_jsonl(path: Union[str, Path]) -> Iterator[Any]:
+    """
+    Iterate over the records of a JSON Lines file.
+
+    Lines that do not decode, such as one cut short by a crash mid-write,
+    are skipped.
+
+    Args:
+        path: Path to the JSONL file
+
+    Yields:
+        The decoded record of each line
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield parse_json(line)
+            except ValueError:
+                continue
+
+
+def resolve_log_refs(tests: Dict[str, Any], log_bodies: Union[List[str], Dict[int, str]]) -> None:
+    """
+    Fill in the text of test logs that reference a shared log body.
+
+    The detector stores each distinct failure log once in "log_bodies" and
+    has every log entry point at it through "log_ref". This adds the text
+    back to each entry under "log", in place.
+
+    Args:
+        tests: Test records keyed by test ID
+        log_bodies: Distinct failure logs of the results file, indexed by log_ref
+    """
+    for test_data in tests.values():
+        for log in test_data.get("logs", []):
+            if "log" not in log and "log_ref" in log:
+                log["log"] = log_bodies[log["log_ref"]]